@@ -1,5 +1,10 @@
 #!python
 
+import time
+
+# for --startup-time, taken before anything else is imported
+STARTUP_TIME = time.perf_counter()
+
 import sys
 import os
 import re
@@ -9,16 +14,25 @@ import traceback
 import pathlib
 import shutil
 import operator
+import bisect
+import concurrent.futures
 import glob
 import fnmatch
-import patoolib
 import json
 import tempfile
+import sqlite3
+import threading
+import collections
+import hashlib
+import random
+import zipfile
+import zlib
+import io
+import abc
 
 import warnings
 warnings.simplefilter('ignore', UserWarning)
 
-from typeguard import typechecked
 from typing import Optional, List
 
 from PySide2.QtWidgets import (                 # pylint: disable=no-name-in-module
@@ -28,18 +42,28 @@ from PySide2.QtWidgets import (                 # pylint: disable=no-name-in-mod
     QPushButton,
     QVBoxLayout,
     QHBoxLayout,
-    QListWidget,
+    QListView,
     QLabel,
     QComboBox,
     QMessageBox,
-    QListWidgetItem,
     QSizePolicy,
     QMenu,
     QAction,
     QWidget
 )
 from PySide2 import QtCore, QtGui
-from PySide2.QtCore import Qt, QTimer, QObject                  # pylint: disable=no-name-in-module
+from PySide2.QtCore import (                    # pylint: disable=no-name-in-module
+    Qt,
+    QTimer,
+    QObject,
+    QFileSystemWatcher,
+    QRunnable,
+    QThreadPool,
+    QThread,
+    QAbstractListModel,
+    QModelIndex,
+    Signal
+)
 from PySide2.QtGui import QKeyEvent, QFont, QGuiApplication     # pylint: disable=no-name-in-module
 
 from configparser import ConfigParser
@@ -54,13 +78,47 @@ if sys.version_info[0] < 3 or sys.version_info[1] < 6:
     exit(2)
 
 
+show_startup_time = '--startup-time' in sys.argv
+
+def print_startup_time(stage:str):
+    if not show_startup_time:
+        return
+
+    print('Startup: {stage} after {time:.3f}s'.format(stage=stage, time=time.perf_counter() - STARTUP_TIME))
+
+
+print_startup_time('modules imported')
+
+
 APP_NAME = 'ESide v0.1'
 APP_ICON = 'iVBORw0KGgoAAAANSUhEUgAAAgAAAAIACAYAAAD0eNT6AAAgAElEQVR4Xu3dT8xm533W8fu8M5lESKUIWkcF2gUgRP60my5izyKeVcKqUtWME2CD2DRsqFhUorEpDyV2kbpAZUO6QWyAxE5VqSuSBXKysJ1FNyVxEIIuWqCKSxGlC5LJzHvQ2KlIWtLHfd7rd+5z7vtjKVIW51y/+/5ev/POd2asZGn+QQABBBBAAIHpCCzT3diFEUAAAQQQQKARAEuAAAIIIIDAhAQIwISluzICCCCAAAIEwA4ggAACCCAwIQECMGHprowAAggggAABsAMIIIAAAghMSIAATFi6KyOAAAIIIEAA7AACCCCAAAITEiAAE5buyggggAACCBAAO4AAAggggMCEBAjAhKW7MgIIIIAAAgTADiCAAAIIIDAhAQIwYemujAACCCCAAAGwAwgggAACCExIgABMWLorI4AAAgggQADsAAIIIIAAAhMSIAATlu7KCCCAAAIIEAA7gAACCCCAwIQECMCEpbsyAggggAACBMAOIIAAAgggMCEBAjBh6a6MAAIIIIAAAbADCCCAAAIITEiAAExYuisjgAACCCBAAOwAAggggAACExIgABOW7soIIIAAAggQADuAAAIIIIDAhAQIwISlz3Tl+z/6T7/3G7cfvWvrO//ql559o7W2bj130HnLj33g+Se2vts7H976+ku/9g9+b+u55iGwFQECsBVpc7oQuH/3haeur9cnl9b+9BYHWJZlXddHX3z/a4++eGqn6y1mjj7j1E5XX37y1geX5dYH13Xd5GfW2tr/Xpb1S5999blXRufrfvMS2ORjmhevm/cm8BNPPv/M1XL1XGvrD290loePrr/5oR/50voFApAh/lgAfv0Dy9O3rt7x+dba7Uzq2ZQvX6/rP/nl15598eyTHkDgoAQIwEGLc+y3R4AAvD1Oe36KAOy5HWc7MgECcOT2nP0sAQJwFtHuHyAAu6/IAQ9KgAActDjHfnsE3hKA5R+21t7/9t648VP+CuDGCL8zgACEgYpD4FsECIBVGJoAATh+vQTg+B26wT4JEIB99uJUIQIEIASyYwwB6Ajf6KEJEICh63U5/w7A8XeAABy/QzfYJwECsM9enCpEgACEQHaMIQAd4Rs9NAECMHS9LkcAjr8DBOD4HbrBPgkQgH324lQhAgQgBLJjDAHoCN/ooQkQgKHrdTn/EuDxd4AAHL9DN9gnAQKwz16cKkSAAIRAdowhAB3hGz00AQIwdL0u568Ajr8DBOD4HbrBPgkQgH324lQhAgQgBLJjDAHoCN/ooQkQgKHrdTkCcPwdIADH79AN9kmAAOyzF6cKESAAIZAdYwhAR/hGD02AAAxdr8sRgOPvAAE4fodusE8CBGCfvThViAABCIHsGEMAOsI3emgCBGDoel2OABx/BwjA8Tt0g30SIAD77MWpQgQIQAhkxxgC0BG+0UMTIABD1+tyBOD4O0AAjt+hG+yTAAHYZy9OFSJAAEIgO8YQgI7wjR6aAAEYul6XIwDH3wECcPwO3WCfBAjAPntxqhABAhAC2TGGAHSEb/TQBAjA0PW6HAE4/g4QgON36Ab7JEAA9tmLU4UIEIAQyI4xBKAjfKOHJkAAhq7X5QjA8XeAABy/QzfYJwECsM9enCpEgACEQHaMIQAd4Rs9NAECMHS9LkcAjr8DBOD4HbrBPgkQgH324lQhAgQgBLJjDAHoCN/ooQkQgKHrdTkCcPwdIADH79AN9kmAAOyzF6cKESAAIZAdYwhAR/hGD02AAAxdr8sRgOPvAAE4fodusE8CBGCfvThViAABCIHsGEMAOsI3emgCBGDoel2OABx/BwjA8Tt0g30SIAD77MWpQgQIQAhkxxgC0BG+0UMTIABD1+tyBOD4O0AAjt+hG+yTAAHYZy9OFSJAAEIgO8YQgI7wjR6aAAEYul6XIwDH3wECcPwO3WCfBAjAPntxqhABAhAC2TGGAHSEb/TQBAjA0PW6HAE4/g4QgON36Ab7JEAA9tmLU4UIEIAQyI4xBKAjfKOHJkAAhq7X5QjA8XeAABy/QzfYJwECsM9enCpEgACEQHaMIQAd4Rs9NAECMHS9LkcAjr8DBOD4HbrBPgkQgH324lQhAgQgBLJjDAHoCN/ooQkQgKHrdTkCcPwdIADH79AN9kmAAOyzF6cKESAAIZAdYwhAR/hGD02AAAxdr8sRgOPvAAE4fodusE8CBGCfvThViAABCIHsGEMAOsI3emgCBGDoel2OABx/BwjA8Tt0g30SIAD77MWpQgQIQAhkxxgC0BG+0UMTIABD1+tyBOD4O0AAjt+hG+yTAAHYZy9OFSJAAEIgO8YQgI7wjR6aAAEYul6XIwDH3wECcPwO3WCfBJZ79063tzzavXvt+nQ6XW8506w8gdPpdPXyy+0qn5xN/L7/846PLFfLs62192eTv2vaw7Wtf/3PPvi+L/6n7/ntdaOZQ4/5q7//A8v/vPM/Pri05d+11rb6efXl60fXL/zun3r40t7h+pm694be3vl6/Exdnrn7wr9/e8dLPbV+4cVXnv3HqTQ5fQjcf+qFn12Wdq/P9Lc/dV3b4z/lem9r7Ym3/9aNnnz8i/4XlqX5xf9GGL/z5W/1+HRrb/a5xT9vtNZeP0KP69pefunVT/zcFlDMqCPwzN3n/1Fry+Md3+yf5f5TLzzabFprbyzL+ksvvvLsacOZRhUQeObJF/7turRnCqILIpeltXWrXzgen9+fcBW02NqWf+K0rK2th5C4ZW0vvvjaJ/5GDXKpWxF45u7zp3VdfnLD36y0xwKw2ZIvrX2tLeunCMBWK1U35/7dFz7d1vbRugmSEUDgbRFY2mdeeuUTH3tbz3potwQeC0Bbl4+vrb17q0MSgK1IDzaHAAxWqOsclwABOG5333ZyAjBEjXNcggDM0bNbHoAAAThASeePSADOM/LETggQgJ0U4RgIEIAhdoAADFHjHJcgAHP07JYHIEAADlDS+SMSgPOMPLETAgRgJ0U4BgIEYIgdIABD1DjHJQjAHD275QEIEIADlHT+iATgPCNP7IQAAdhJEY6BAAEYYgcIwBA1znEJAjBHz255AAIE4AAlnT8iATjPyBM7IUAAdlKEYyBAAIbYAQIwRI1zXIIAzNGzWx6AAAE4QEnnj0gAzjPyxE4IEICdFOEYCBCAIXaAAAxR4xyXIABz9OyWByBAAA5Q0vkjEoDzjDyxEwIEYCdFOAYCBGCIHSAAQ9Q4xyUIwBw9u+UBCBCAA5R0/ogE4DwjT+yEAAHYSRGOgQABGGIHCMAQNc5xCQIwR89ueQACBOAAJZ0/IgE4z8gTOyFAAHZShGMgQACG2AECMESNc1yCAMzRs1segAABOEBJ549IAM4z8sROCBCAnRThGAgQgCF2gAAMUeMclyAAc/TslgcgQAAOUNL5IxKA84w8sRMCBGAnRTgGAgRgiB0gAEPUOMclCMAcPbvlAQgQgAOUdP6IBOA8I0/shAAB2EkRjoEAARhiBwjAEDXOcQkCMEfPbnkAAgTgACWdPyIBOM/IEzshQAB2UoRjIEAAhtgBAjBEjdtf4mMf/OQPPnpw6+6mk5f1p1prT2060zAEEPj/EXi1rcsvbonm1p1Hr3z6i8/91pYzR59FAEZvuOh+95/8+Y+2Zf10UbxYBBBA4DsJrMvHXnrtZz4DS44AAcixnCqJAExVt8si0J8AAYh3QADiSOcIJABz9OyWCOyGAAGIV0EA4kjnCCQAc/TslgjshgABiFdBAOJI5wgkAHP07JYI7IYAAYhXQQDiSOcIJABz9OyWCOyGAAGIV0EA4kjnCCQAc/TslgjshgABiFdBAOJI5wgkAHP07JYI7IYAAYhXQQDiSOcIJABz9OyWCOyGAAGIV0EA4kjnCCQAc/TslgjshgABiFdBAOJI5wgkAHP07JYI7IYAAYhXQQDiSOcIJABz9OyWCOyGAAGIV0EA4kjnCCQAc/TslgjshgABiFdBAOJI5wgkAHP07JYI7IYAAYhXQQDiSOcIJABz9OyWCOyGAAGIV0EA4kjnCCQAc/TslgjshgABiFdBAOJI5wgkAHP07JYI7IYAAYhXQQDiSOcIJABz9OyWCOyGAAGIV0EA4kjnCCQAc/TslgjshgABiFdBAOJI5wgkAHP07JYI7IYAAYhXQQDiSOcIJABz9OyWCOyGAAGIV0EA4kjnCCQAc/TslgjshgABiFdBAOJI5wgkAHP07JYI7IYAAYhXQQDiSOcIJABz9OyWCOyGAAGIV0EA4kjnCCQAc/TslgjshgABiFdBAOJI5wgkAHP07JYI7IYAAYhXQQDiSOcIJABz9OyWCOyGAAGIV0EA4kjnCCQAc/TslgjshgABiFdBAOJItw88nU5XX/ncneeWtb1nvWrLJidY2w+11p7aZJYhCCCAQGuvtqX95hYgluu2rkv76vs+/OCTp9PpeouZPWYQgB7UwzPv3TvdfuLBnc+va3u6tXYVjheHAAIIzEbgelnaF9648+BDL798ejjq5QnAAM0SgAFKdAUEENgTAQJQ1MZy/6kX1qLsPxK7tPa1tqyfevGVZ09bzdx6DgHYmrh5CCAwOAECUFQwAQiDJQBhoOIQQGB2AgSgaAMIQBgsAQgDFYcAArMTIABFG0AAwmAJQBioOAQQmJ0AASjaAAIQBksAwkDFIYDA7AQIQNEGEIAwWAIQBioOAQRmJ0AAijaAAITBEoAwUHEIIDA7AQJQtAEEIAyWAISBikMAgdkJEICiDSAAYbAEIAxUHAIIzE6AABRtAAEIgyUAYaDiEEBgdgIEoGgDCEAYLAEIAxWHAAKzEyAARRtAAMJgCUAYqDgEEJidAAEo2gACEAZLAMJAxSGAwOwECEDRBhCAMFgCEAYqDgEEZidAAIo2gACEwRKAMFBxCCAwOwECULQBBCAMlgCEgYpDAIHZCRCAog0gAGGwBCAMVBwCCMxOgAAUbQABCIMlAGGg4hBAYHYCBKBoAwhAGCwBCAMVhwACsxMgAEUbQADCYAlAGKg4BBCYnQABKNoAAhAGSwDCQMUhgMDsBAhA0QYQgDBYAhAGKg4BBGYnQACKNoAAhMESgDBQcQggMDsBAlC0AQQgDJYAhIGKQwCB2QkQgKINIABhsAQgDFQcAgjMToAAFG0AAQiDJQBhoOIQQGB2AgSgaAMIQBgsAQgDFYcAArMTIABFG0AAwmAJQBioOAQQmJ0AASjaAAIQBksAwkDFIYDA7AQIQNEGEIAwWAIQBioOAQRmJ0AAijaAAITBEoAwUHEIIDA7AQJQtAEEIAyWAISBikMAgdkJEICiDSAAYbAEIAxUHAIIzE6AABRtAAEIgyUAYaDiEEBgdgIEoGgDCEAYLAEIAxWHAAKzEyAARRtAAMJgCUAYqDgEEJidAAEo2gACEAZLAMJAxSGAwOwECEDRBhCAMFgCEAYqDgEEZidAAIo2gACEwRKAMFBxCCAwOwECULQBBCAMlgCEgb4Vt7bWXl9be72tb/73If9ZlvaDrbX3tta+d8gLtvZ7b/a4tt8a9H6tLW1Z3urw8X+WYe+57cUIQBFvAhAGSwDCQN+Ke/MHwPLw6u+3248elUzYQei6Xv2d1ta/ubb27h0cJ36EpbWvtbb8m2W5/pfx8L0EPrx1a719/c/WtT3dWrvay7EOfg4CUFQgAQiDJQBhoN8mAG/cefChl18+PSyZsIPQZ+4+f2rr8vGhBWBZP/XiK8+edoC75Ai+/xKsBKAEa2sEIAzWD4AwUAJQArRH6Jt/AkAAeqA/+kwCUNQgAQiDJQBhoASgBGiPUALQg/oQMwlAUY0EIAyWAISBEoASoD1CCUAP6kPMJABFNRKAMFgCEAZKAEqA9gglAD2oDzGTABTVSADCYAlAGCgBKAHaI5QA9KA+xEwCUFQjAQiDJQBhoASgBGiPUALQg/oQMwlAUY0EIAyWAISBEoASoD1CCUAP6kPMJABFNRKAMFgCEAZKAEqA9gglAD2oDzGTABTVSADCYAlAGCgBKAHaI5QA9KA+xEwCUFQjAQiDJQBhoASgBGiPUALQg/oQMwlAUY0EIAyWAISBEoASoD1CCUAP6kPMJABFNRKAMFgCEAZKAEqA9gglAD2oDzGTABTVSADCYAlAGCgBKAHaI5QA9KA+xEwCUFQjAQiDJQBhoASgBGiPUALQg/oQMwlAUY0EIAyWAISBEoASoD1CCUAP6kPMJABFNRKAMFgCEAZKAEqA9gglAD2oDzGTABTVSADCYAlAGCgBKAHaI5QA9KA+xEwCUFQjAQiDJQBhoASgBGiPUALQg/oQMwlAUY0EIAyWAISBEoASoD1CCUAP6kPMJABFNRKAMFgCEAZKAEqA9gglAD2oDzGTABTVSADCYAlAGCgBKAHaI5QA9KA+xEwCUFQjAQiDJQBhoASgBGiPUALQg/oQMwlAUY0EIAyWAISBEoASoD1CCUAP6kPMJABFNRKAMFgCEAZKAEqA9gglAD2oDzGTABTVSADCYAlAGCgBKAHaI5QA9KA+xEwCUFQjAQiDJQBhoASgBGiPUALQg/oQMwlAUY0EIAyWAISBEoASoD1CCUAP6kPMJABFNRKAMFgCEAZKAEqA9gglAD2oDzGTABTVSADCYAlAGCgBKAHaI5QA9KA+xEwCUFQjAQiDJQBhoASgBGiPUALQg/oQMwlAUY0EIAyWAISBEoASoD1CCUAP6kPMJABFNRKAMFgCEAZKAEqA9gglAD2oDzGTABTVSADCYAlAGCgBKAHaI5QA9KA+xEwCUFQjAQiDJQBhoASgBGiPUALQg/oQMwlAUY0EIAyWAISBEoASoD1CCUAP6kPMJABFNRKAMFgCEAZKAEqA9gglAD2oDzGTABTVSADCYAlAGCgBKAHaI5QA9KA+xEwCUFQjAQiDJQBhoASgBGiPUALQg/oQMwlAUY0EIAyWAISBEoASoD1CCUAP6kPMJABFNRKAMFgCEAZKAEqA9gglAD2oDzGTABTVSADCYAlAGCgBKAHaI5QA9KA+xEwCUFQjAQiDJQBhoASgBGiPUALQg/oQMwlAUY0EIAyWAISBEoASoD1CCUAP6kPMJABFNRKAMFgCEAZKAEqA9gglAD2oDzGTABTVSADCYAlAGCgBKAHaI5QA9KA+xEwCUFQjAQiDJQBhoASgBGiPUALQg/oQMwlAUY0EIAyWAISBEoASoD1CCUAP6kPMJABFNRKAMFgCEAZKAEqA9gglAD2oDzGTABTVSADCYAlAGCgBKAHaI5QA9KA+xEwCUFQjAQiDJQBhoASgBGiPUALQg/oQMwlAUY0EIAyWAISBEoASoD1CCUAP6kPMJABFNRKAMFgCEAZKAEqA9gglAD2oDzGTABTVSADCYAlAGCgBKAHaI5QA9KA+xEwCUFQjAQiDJQBhoASgBGiPUALQg/oQMwlAUY3L/bsvfLoo+4/ELuv6jbZc/cZ63f7jVjO3nrMs7Wpd1mfb2t7bWlu2nj/oPD8ABiiWAAxQYp8rrG1pry/r8vy6tus+R6ifuly1v9bW67+0Lss766e9NWHTX6B+/O4vPHHr+sHfXZbltNUFzRmCAAEYoEYCMECJrlBGYF3X06OrO//iV1756TfKhvyhYAKwFWlzbkKAANyE3k7eJQA7KcIxdkmAAOyyFofaAQECsIMSbnoEAnBTgt4fmQABGLldd7sJAQJwE3o7eZcA7KQIx9glAQKwy1ocagcECMAOSrjpEQjATQl6f2QCBGDkdt3tJgQIwE3o7eRdArCTIhxjlwQIwC5rcagdECAAOyjhpkcgADcl6P2RCRCAkdt1t5sQIAA3obeTdwnATopwjF0SIAC7rMWhdkCAAOyghJsegQDclKD3RyZAAEZu191uQoAA3ITeTt4lADspwjF2SYAA7LIWh9oBAQKwgxJuegQCcFOC3h+ZAAEYuV13uwkBAnATejt5lwDspAjH2CUBArDLWhxqBwQIwA5KuOkRCMBNCXp/ZAIEYOR23e0mBAjATejt5F0CsJMiHGOXBIYXgB/7wPPvvrO0j/t/A9zl/u35UARgz+28zbMRgLcJymNTEngsAA/W9qlf/dKzX9sKwKb/b4AEYKtah5tDAAaolAAMUKIrlBEgAGVoBR+cAAE4eIGPj08ABijRFcoIEIAytIIPToAAHLxAAjBAga5QSoAAlOIVfmACBODA5f3B0f0JwAAlukIZAQJQhlbwwQkQgIMX6E8ABijQFUoJEIBSvMIPTIAAHLg8fwIwQHmuUE6AAJQjNuCgBAjAQYv79mP7K4ABSnSFMgIEoAyt4IMTIAAHL9BfAQxQoCuUEiAApXiFH5gAAThwef4KYIDyXKGcAAEoR2zAQQkQgIMW568ABijOFTYhQAA2wWzIAQkQgAOW9oeP7N8BGKBEVygjQADK0Ao+OAECcPAC/TsAAxToCqUECEApXuEHJkAADlyefwdggPJcoZzA8ALwt++d3vX733zXX756tL6/nGanAcvSrtZlfbat7b1v/c+f+ydAgAAEIPaO8FcAvRs47Py1Le31ZV2eX9d2fdhbnDn49a3ly9/zjq//l3/18unrW93RL1Bh0vfunW4/8eDO59e1Pd1auwrHzxpHAAZongAMUGKfK0zx/fdASwDC1AlAGOhbcVP8AHjm7vOnti4fX1t7dwnFzqEEoHMBxx0/xfffox4CEKZOAMJACUAJ0B6hBKAH9SFmEoCiGglAGCwBCAMlACVAe4QSgB7Uh5hJAIpqJABhsAQgDJQAlADtEUoAelAfYiYBKKqRAITBEoAwUAJQArRHKAHoQX2ImQSgqEYCEAZLAMJACUAJ0B6hBKAH9SFmEoCiGglAGCwBCAMlACVAe4QSgB7Uh5hJAIpqJABhsAQgDJQAlADtEUoAelAfYiYBKKqRAITBEoAwUAJQArRHKAHoQX2ImQSgqEYCEAZLAMJACUAJ0B6hBKAH9SFmEoCiGglAGCwBCAMlACVAe4QSgB7Uh5hJAIpqJABhsAQgDJQAlADtEUoAelAfYiYBKKqRAITBEoAwUAJQArRHKAHoQX2ImQSgqEYCEAZLAMJACUAJ0B6hBKAH9SFmEoCiGglAGCwBCAMlACVAe4QSgB7Uh5hJAIpqJABhsAQgDJQAlADtEUoAelAfYiYBKKqRAITBEoAwUAJQArRHKAHoQX2ImQSgqEYCEAZLAMJACUAJ0B6hBKAH9SFmEoCiGglAGCwBCAMlACVAe4QSgB7Uh5hJAIpqJABhsAQgDJQAlADtEUoAelAfYiYBKKqRAITBEoAwUAJQArRHKAHoQX2ImQSgqEYCEAZLAMJACUAJ0B6hBKAH9SFmEoCiGglAGCwBCAMlACVAe4QSgB7Uh5hJAIpqJABhsAQgDJQAlADtEUoAelAfYiYBKKqRAITBEoAwUAJQArRHKAHoQX2ImQSgqEYCEAZLAMJAv00A/sw3/tyH//yv/fajkgk7CH397jt+tq3Lx9fW3r2D48SP8AcC8N5Xvvlz8fCdBP73H/2BW//rnb/7uXVtT7fWrnZyrKMfgwAUNUgAwmAJQBjotwSgtfbFta2fvL5+eF0yYQeht5fbH2nL8hNDC8C6/vLD9eFnd4C75AhXV7evlrY811r7IAGIISYAMZTfGUQAwmAJQBjo/4tbW2vD/u7/W9d8/DvG0X/X+FjghpW4b/V4q7XmZ2vuRwEByLH8jiRLGgZLAMJAxSGAwOwECEDRBhCAMFgCEAYqDgEEZidAAIo2gACEwRKAMFBxCCAwOwECULQBBCAMlgCEgYpDAIHZCRCAog0gAGGwBCAMVBwCCMxOgAAUbQABCIMlAGGg4hBAYHYCBKBoAwhAGCwBCAMVhwACsxMgAEUbQADCYAlAGKg4BBCYnQABKNoAAhAGSwDCQMUhgMDsBAhA0QYQgDBYAhAGKg4BBGYnQACKNoAAhMESgDBQcQggMDsBAlC0AQQgDJYAhIGKQwCB2QkQgKINIABhsAQgDFQcAgjMToAAFG0AAQiDJQBhoOIQQGB2AgSgaAMIQBgsAQgDFYcAArMTIABFG0AAwmAJQBioOAQQmJ0AASjaAAIQBksAwkDFIYDA7AQIQNEGEIAwWAIQBioOAQRmJ0AAijaAAITBEoAwUHEIIDA7AQJQtAEEIAyWAISBikMAgdkJEICiDSAAYbAEIAxUHAIIzE6AABRtAAEIgyUAYaDiEEBgdgIEoGgDCEAYLAEIAxWHAAKzEyAARRtAAMJgCUAYqDgEEJidAAEo2gACEAZLAMJAxSGAwOwECEDRBhCAMFgCEAYqDgEEZidAAIo2gACEwRKAMFBxCCAwOwECULQBBCAMlgCEgYpDAIHZCRCAog0gAGGwBCAMVBwCCMxOgAAUbQABCIMlAGGg4hBAYHYCBKBoAwhAGCwBCAMVhwACsxMgAEUbQADCYAlAGKg4BBCYnQABKNoAAhAGSwDCQMUhgMDsBAhA0QYQgDBYAhAGKg4BBGYnQACKNoAAhMESgDBQcQggMDsBAlC0AQQgDJYAhIGKQwCB2QkQgKINIABhsAQgDFQcAgjMToAAFG0AAQiDJQBhoOIQQGB2AgSgaAMIQBgsAQgDFYcAArMTIABFG0AAwmAJQBioOAQQmJ0AASjaAAIQBksAwkDFIYDA7AQIQNEGEIAwWAIQBioOAQRmJ0AAijaAAITBEoAwUHEIIDA7AQJQtAEEIAyWAISBikMAgdkJEICiDSAAYbAEIAxUHAIIzE6AABRtAAEIgyUAYaDiEEBgdgIEoGgDCEAYLAEIAxWHAAKzEyAARRtAAMJgCUAYqDgEEJidAAEo2gACEAZLAMJAxSGAwOwECEDRBhCAMFgCEAYqDgEEZidAAIo2gACEwRKAMFBxCCAwOwECULQBBCAMlgCEgYpDAIHZCRCAog0gAGGwBCAMVBwCCMxOgAAUbQABCIMlAGGg4hBAYHYCBKBoAwhAGCwBCAMVhwACsxMgAG/SS6MAAA00SURBVEUbQADCYAlAGKg4BBCYnQABKNoAAhAGSwDCQMUhgMDsBAhA0QYQgDBYAhAGKg4BBGYnQACKNoAAhMESgDBQcQggMDsBAlC0AQQgDJYAhIGKQwCB2QkQgKINIABhsAQgDFQcAgjMToAAFG0AAQiDJQBhoOIQQGB2AgSgaAMIQBgsAQgDFYcAArMTIABFG0AAwmAJQBioOAQQmJ0AASjaAAIQBksAwkDFIYDA7AQIQNEGEIAwWAIQBioOAQRmJ0AAijaAAITBEoAwUHEIIDA7AQJQtAEEIAyWAISBikMAgdkJEICiDSAAYbAEIAxUHAIIzE6AABRtAAEIgz2dTldf+dyd55a1vWe9auPyXdtTrbUfCuMbIW5ta3t5XdrvLEtbR7hQ7zusa1uWtX1/W9q91gb+pi4H/Zttaa9e/vq+31yu27ou7avv+/CDT55Op+t9n/ZYpxv3F6hj9XC4096/+8Kn29o+eriD1x/44aPrb37oR760fuHU/LBK4D6109Wvf2B5+tbVOz7fWrudyBwqY2mfeemVT3xsqDu5zCYECMAmmMcbQgC+a6cEILzuBOAMUAIQ3rh54gjAPF1Hb0oACEB0of6YMAJAALbatdnmEIDZGg/dlwAQgNAqnY0hAATg7JJ44CICBOAibF4iAARgq6+AABCArXZttjkEYLbGQ/clAAQgtEpnYwgAATi7JB64iAABuAiblwgAAdjqKyAABGCrXZttDgGYrfHQfQkAAQit0tkYAkAAzi6JBy4iQAAuwuYlAkAAtvoKCAAB2GrXZptDAGZrPHRfAkAAQqt0NoYAEICzS+KBiwgQgIuweYkAEICtvgICQAC22rXZ5hCA2RoP3ZcAEIDQKp2NIQAE4OySeOAiAgTgImxeIgAEYKuvgAAQgK12bbY5BGC2xkP3JQAEILRKZ2MIAAE4uyQeuIgAAbgIm5cIAAHY6isgAARgq12bbQ4BmK3x0H0JAAEIrdLZGAJAAM4uiQcuIkAALsLmJQJAALb6CggAAdhq12abQwBmazx0XwJAAEKrdDaGABCAs0vigYsIEICLsHmJABCArb4CAkAAttq12eYQgNkaD92XABCA0CqdjSEABODsknjgIgIE4CJsXiIABGCrr4AAEICtdm22OQRgtsZD9yUABCC0SmdjCAABOLskHriIAAG4CJuXCAAB2OorIAAEYKtdm20OAZit8dB9CQABCK3S2RgCQADOLokHLiJAAC7C5iUCQAC2+goIAAHYatdmm0MAZms8dF8CQABCq3Q2hgAQgLNL4oGLCBCAi7B5iQAQgK2+AgJAALbatdnmEIDZGg/dlwAQgNAqnY0hAATg7JJ44CICBOAibF4iAARgq6+AABCArXZttjkEYLbGQ/clAAQgtEpnYwgAATi7JB64iAABuAiblwgAAdjqKyAABGCrXZttDgGYrfHQfQkAAQit0tkYAkAAzi6JBy4iQAAuwuYlAkAAtvoKCAAB2GrXZptDAGZrPHRfAkAAQqt0NoYAEICzS+KBiwgQgIuweYkAEICtvgICQAC22rXZ5hCA2RoP3ZcAEIDQKp2NIQAE4OySeOAiAgTgImxeIgAEYKuvgAAQgK12bbY5BGC2xkP3JQAEILRKZ2MIAAE4uyQeuIgAAbgIm5cIAAHY6isgAARgq12bbQ4BmK3x0H0JAAEIrdLZGAJAAM4uiQcuIkAALsLmJQJAALb6CggAAdhq12abQwBmazx0XwJAAEKrdDaGABCAs0vigYsIEICLsHmJABCArb4CAkAAttq12eYQgNkaD92XABCA0CqdjSEABODsknjgIgIE4CJsXiIABGCrr4AAEICtdm22OQRgtsZD9yUABCC0SmdjCAABOLskHriIAAG4CJuXCAAB2OorIAAEYKtdm20OAZit8dB9CQABCK3S2RgCQADOLokHLiJAAC7C5iUCQAC2+goIAAHYatdmm0MAZms8dF8CQABCq3Q2hgAQgLNL4oGLCBCAi7B5iQAQgK2+AgJAALbatdnmEIDZGg/dlwAQgNAqnY0hAATg7JJ44CICBOAibF4iAARgq6+AABCArXZttjkEYLbGQ/clAAQgtEpnYwgAATi7JB64iAABuAiblwgAAdjqKyAABGCrXZttDgGYrfHQfQkAAQit0tkYAkAAzi6JBy4iQAAuwuYlAkAAtvoKCAAB2GrXZptDAGZrPHRfAkAAQqt0NoYAEICzS+KBiwgQgIuweYkAEICtvgICQAC22rXZ5hCA2RoP3ZcAEIDQKp2NIQAE4OySeOAiAgTgImxeIgAEYKuvgAAQgK12bbY5BGC2xkP3JQAEILRKZ2MIAAE4uyQeuIgAAbgIm5cIAAHY6isgAARgq12bbQ4BmK3x0H0JAAEIrdLZGAJAAM4uiQcuIkAALsLmJQJAALb6CggAAdhq12abQwBmazx0XwJAAEKrdDaGABCAs0vigYsIEICLsHmJABCArb4CAkAAttq12eYQgNkaD92XABCA0CqdjSEABODsknjgIgIE4CJsXiIABGCrr4AAEICtdm22OQRgtsZD9yUABCC0SmdjCAABOLskHriIAAG4CNt3f+nxD6v/8OQ7PhKO3V3cVVs+sLb2F3d3sP4Hum7t0S+9/7VHXzy103X/4xz/BI+/qS8/eeuDrd36ydba1fFvlL3B0tp/vW7rl7Kp+0v74de++VnfVLYXApDl2e7ff/FW+2//+V+3tb23tTYs3+u1/fPbV+urYXyHj3vw5g3uvPErr/z077TW1sNfaB8XWH787i98f2sPnrizj/Ps6hQPr5enrpb293Z1qOxh1ra019tf+Ct/66WXnnmUjZ47bdhfoHrVeu/e6fYTD+58fl3b00P/bmVdPvbSaz/zmV6czUUAgbcI3H/y5z/alvXTA/O4Xpb2hTfuPPjQyy+fHg58z82vRgDCyAlAGKg4BBD4YwkQAAtyKQECcCm57/IeAQgDFYcAAgTAnwCUfAUEIIyVAISBikMAAQJAAEq+AgIQxkoAwkDFIYAAASAAJV8BAQhjJQBhoOIQQIAAEICSr4AAhLESgDBQcQggQAAIQMlXQADCWAlAGKg4BBAgAASg5CsgAGGsBCAMVBwCCBAAAlDyFRCAMFYCEAYqDgEECAABKPkKCEAYKwEIAxWHAAIEgACUfAUEIIyVAISBikMAAQJAAEq+AgIQxkoAwkDFIYAAASAAJV8BAQhjJQBhoOIQQIAAEICSr4AAhLESgDBQcQggQAAIQMlXQADCWAlAGKg4BBAgAASg5CsgAGGsBCAMVBwCCBAAAlDyFRCAMFYCEAYqDgEECAABKPkKCEAYKwEIAxWHAAIEgACUfAUEIIyVAISBikMAAQJAAEq+AgIQxkoAwkDFIYAAASAAJV8BAQhjJQBhoOIQQIAAEICSr4AAhLESgDBQcQggQAAIQMlXQADCWAlAGKg4BBAgAASg5CsgAGGsBCAMVBwCCBAAAlDyFRCAMFYCEAYqDgEECAABKPkKCEAYKwEIAxWHAAIEgACUfAUEIIyVAISBikMAAQJAAEq+AgIQxkoAwkDFIYAAASAAJV8BAQhjJQBhoOIQQIAAEICSr4AAhLESgDBQcQggQAAIQMlXQADCWAlAGKg4BBAgAASg5CsgAGGsBCAMVBwCCBAAAlDyFRCAMFYCEAYqDgEECAABKPkKCEAYKwEIAxWHAAIEgACUfAUEIIyVAISBikMAAQJAAEq+AgIQxkoAwkDFIYAAASAAJV8BAQhjJQBhoOIQQIAAEICSr4AAhLESgDBQcQggQAAIQMlXQADCWAlAGKg4BBAgAASg5CsgAGGsBCAMVBwCCBAAAlDyFRCAMFYCEAYqDgEECAABKPkKCEAYKwEIAxWHAAIEgACUfAUEIIyVAISBikMAAQJAAEq+AgIQxkoAwkDFIYAAASAAJV8BAQhjJQBhoOIQQIAAEICSr4AAhLESgDBQcQggQAAIQMlXQADCWAlAGKg4BBAgAASg5CsgAGGsBCAMVBwCCBAAAlDyFRCAMFYCEAYqDgEECAABKPkKCEAYKwEIAxWHAAIEgACUfAUEIIyVAISBikMAAQJAAEq+AgIQxkoAwkDFIYAAASAAJV8BAQhjJQBhoOIQQIAAEICSr4AAhLESgDBQcQggQAAIQMlXQADCWE+n09VXPnfnuWVt71mv2sh8f/GlVz7xahifOAQQ+BMSuH/3hadaaz/1J3ztMI8v121dl/bV9334wSdPp9P1YQ5+gIOO/AvUAfA7IgIIIIAAAn0IEIA+3E1FAAEEEECgKwEC0BW/4QgggAACCPQhQAD6cDcVAQQQQACBrgQIQFf8hiOAAAIIINCHAAHow91UBBBAAAEEuhIgAF3xG44AAggggEAfAgSgD3dTEUAAAQQQ6EqAAHTFbzgCCCCAAAJ9CBCAPtxNRQABBBBAoCsBAtAVv+EIIIAAAgj0IUAA+nA3FQEEEEAAga4ECEBX/IYjgAACCCDQhwAB6MPdVAQQQAABBLoS+L+VtbmL5Hdq8wAAAABJRU5ErkJggg=='
 APP_URL = 'https://github.com/skazanyNaGlany/eside'
 DEFAULT_CONFIG_PATHNAME = 'eside.ini'
 DEFAULT_ROMS_PATHNAME = 'roms.ini'
+DEFAULT_ROMS_INDEX_PATHNAME = 'eside.db'
+ROMS_INDEX_VERSION = 1
+ROMS_INDEX_MTIME_RESOLUTION = 2
+# FAT stores mtime with 2 seconds resolution
+COPY_MTIME_RESOLUTION = 2
 ANTIMICRO_PROFILE_EXTENSION = '.gamecontroller.amgp'
 ANTIMICRO_EXECUTABLES = ['antimicro.exe', 'antimicro']
+DIRECTORIES_WATCHER_DELAY = 500
+DIRECTORIES_POLL_INTERVAL = 2000
+ROMS_SCAN_FIRST_CHUNK_SIZE = 100
+ROMS_SCAN_CHUNK_SIZE = 2000
+COVER_UPDATE_DELAY = 80
+BENCHMARK_SCAN_ROUNDS = 3
+BENCHMARK_TITLES_COUNT = 100000
+BENCHMARK_TITLES_DISTINCT = 30000
+RUN_GAME_BUTTON_TEXT = 'Run selected game'
+COVER_FAST_SCALE_FACTOR = 2
+COVERS_EXTENSIONS = ['.png', '.jpg', '.jpeg']
+COVERS_THUMBNAILS_DIRECTORY = '.cache'
+COVERS_THUMBNAILS_BUCKET_SIZE = 256
+UNPACK_CACHE_DIRECTORY = 'eside_unpack'
+UNPACK_CACHE_MARKER_EXTENSION = '.done'
+UNPACK_BUFFER_SIZE = 1024 * 1024
+UNPACK_WARM_BATCH_SIZE = 8
 DEFAULT_CONFIG = r"""
 [global]
 # ESide default configuration file. You can create your configuration
@@ -83,6 +141,21 @@ theme = default
 # instead to roms/<system> directory
 unpack_to_tmp = 1
 
+# max. size of unpacked roms kept in temporary directory (in MB)
+# least recently used roms are removed first, 0 to keep all
+unpack_cache_size = 4096
+
+# unpack zip (and lha, if lhafile module is installed) archives
+# without external programs, other archives are unpacked by patool
+unpack_native = 1
+
+# unpack archive rom into temporary directory after it stays
+# selected for this many milliseconds, so it starts at once, 0 to disable
+unpack_warm_delay = 1000
+
+# how many roms are unpacked in background at the same time
+unpack_warm_workers = 2
+
 # show emulator even if it has no roms
 show_non_roms_emulator = 1
 
@@ -95,6 +168,17 @@ show_emulator_name = 0
 # show count of roms next to system name (eg. Sony PlayStation 2 [60])
 show_emulator_roms_count = 0
 
+# how many systems are scanned at the same time on start
+scan_workers = 4
+
+# keep scanned roms in eside.db next to eside.ini, so the roms
+# directories are not scanned again on every start, only these which changed
+roms_index = 1
+
+# watch roms, covers and AntiMicro profiles directories and update
+# games list, covers and profiles as soon as something changes there
+watch_directories = 0
+
 # set to 0 to show only "Run selected game" and "Antimicro profile" buttons
 show_other_buttons = 1
 
@@ -121,6 +205,22 @@ fix_game_title3 = 1
 # the same as first cover is
 covers_same_size = 1
 
+# how many megabytes of already scaled covers are kept in memory,
+# so going back to a game does not load its cover again, 0 to disable
+covers_cache_size = 64
+
+# keep scaled down copies of covers in <covers_base_path>/.cache,
+# so big covers are not decoded again after restart
+covers_thumbnails = 1
+
+# how many megabytes of covers thumbnails are kept, least recently used
+# ones and thumbnails of removed covers are deleted on startup
+covers_thumbnails_size = 256
+
+# load covers of that many games above and below the selected one
+# in background, needs covers_cache_size, 0 to disable
+covers_prefetch_rows = 5
+
 # "antimicro is a graphical program used to map keyboard keys and mouse controls to a gamepad.
 # This program is useful for playing PC games using a gamepad that do not have any form of built-in gamepad support"
 #
@@ -420,25 +520,59 @@ run_pattern0_roms_extensions = EBOOT.BIN
 """
 
 
-# set False in production, True when developing
-typechecked_class_decorator_enabled = True
+# set False in production, True when developing, can be also set by
+# ESIDE_TYPECHECK=0 or 1 environment variable or --no-typecheck and --typecheck options
+typechecked_class_decorator_enabled = os.environ.get('ESIDE_TYPECHECK', '1') == '1'
+
+if '--no-typecheck' in sys.argv:
+    typechecked_class_decorator_enabled = False
+
+if '--typecheck' in sys.argv:
+    typechecked_class_decorator_enabled = True
+
+# [class, attribute name, original method, checked method] of all
+# decorated classes, so checking can be switched on and off when running
+typechecked_methods = []
 
 def typechecked_class_decorator(exclude=None):
     if not exclude:
         exclude = []
 
     def decorate(cls):
-        if not typechecked_class_decorator_enabled:
-            return cls
-
-        for attr in cls.__dict__:
+        for attr in list(cls.__dict__):
             if callable(getattr(cls, attr)) and attr not in exclude:
-                setattr(cls, attr, typechecked(getattr(cls, attr)))
+                typechecked_methods.append([cls, attr, cls.__dict__[attr], None])
+
+        if typechecked_class_decorator_enabled:
+            set_typechecking(True, cls)
+
         return cls
 
     return decorate
 
 
+def set_typechecking(enabled:bool, cls=None):
+    if enabled:
+        # typeguard is slow to import, it is not needed when checking is off
+        from typeguard import typechecked
+
+    for imethod in typechecked_methods:
+        icls, iattr, ioriginal, ichecked = imethod
+
+        if cls and icls is not cls:
+            continue
+
+        if not enabled:
+            setattr(icls, iattr, ioriginal)
+            continue
+
+        if not ichecked:
+            # made once, from the original method
+            ichecked = imethod[3] = typechecked(getattr(icls, iattr))
+
+        setattr(icls, iattr, ichecked)
+
+
 @typechecked_class_decorator()
 class Utils:
     @staticmethod
@@ -506,6 +640,11 @@ class Utils:
         return Utils.adjust_to_system_path(joined)
 
 
+    @staticmethod
+    def is_sub_path(path:str, directory:str) -> bool:
+        return path == directory or path.startswith(os.path.join(directory, ''))
+
+
     @staticmethod
     def find_file_from_list(files_list:list) -> Optional[str]:
         for ifile in files_list:
@@ -541,25 +680,112 @@ class Utils:
         return None
 
 
+    @staticmethod
+    def is_file_copied(src_file:str, dst_file:str) -> bool:
+        try:
+            src_stat = os.stat(src_file)
+            dst_stat = os.stat(dst_file)
+        except FileNotFoundError:
+            return False
+
+        if src_stat.st_size != dst_stat.st_size:
+            return False
+
+        return abs(src_stat.st_mtime - dst_stat.st_mtime) < COPY_MTIME_RESOLUTION
+
+
     @staticmethod
     def copy_files(src_files:list, dst:str, target_is_directory:bool, overwrite:Optional[bool] = False):
         if target_is_directory:
             os.makedirs(dst, exist_ok=True)
 
         for ifile in src_files:
-            with open(ifile, 'rb') as sf:
-                if target_is_directory:
-                    # copy to directory
-                    target_pathname = os.path.join(dst, os.path.basename(ifile))
+            if target_is_directory:
+                # copy to directory
+                target_pathname = os.path.join(dst, os.path.basename(ifile))
 
-                    if not overwrite and os.path.exists(target_pathname):
-                        continue
+                if not overwrite and os.path.exists(target_pathname):
+                    continue
+            else:
+                target_pathname = dst
 
-                    with open(target_pathname, 'wb') as df:
-                        shutil.copyfileobj(sf, df)
-                else:
-                    with open(dst, 'wb') as df:
-                        shutil.copyfileobj(sf, df)
+            if Utils.is_file_copied(ifile, target_pathname):
+                continue
+
+            # copied by the kernel (sendfile) where Python supports it,
+            # mtime is copied too, so the next copy is skipped
+            shutil.copyfile(ifile, target_pathname)
+
+            src_stat = os.stat(ifile)
+            os.utime(target_pathname, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+
+
+    @staticmethod
+    def extract_archive(archive_pathname:str, outdir:str, native:bool = True) -> bool:
+        start_time = time.perf_counter()
+        extractor = ArchiveExtractor.find_extractor(archive_pathname) if native else None
+        unpacked = None
+
+        if extractor:
+            try:
+                unpacked = extractor.extract(archive_pathname, outdir)
+            except ArchiveNotSupportedException as x:
+                print('{name} cannot unpack {archive}: {error}'.format(
+                    name=extractor.name,
+                    archive=archive_pathname,
+                    error=str(x)
+                ))
+
+                # start from scratch with patool
+                shutil.rmtree(outdir, ignore_errors=True)
+                os.makedirs(outdir, exist_ok=True)
+
+        if unpacked is None:
+            extractor = None
+            unpacked = Utils._patool_extract_archive(archive_pathname, outdir)
+
+        print('Unpacked {archive} with {name} in {time:.3f}s'.format(
+            archive=archive_pathname,
+            name=extractor.name if extractor else 'patool',
+            time=time.perf_counter() - start_time
+        ))
+
+        return unpacked
+
+
+    @staticmethod
+    def _patool_extract_archive(archive_pathname:str, outdir:str) -> bool:
+        # slow to import and needed only here
+        import patoolib
+
+        try:
+            patoolib.extract_archive(archive_pathname, outdir=outdir, interactive=False)
+        except Exception as x:
+            x_str = str(x)
+
+            if ' returned non-zero exit status ' in x_str:
+                # omit error when archive cannot be unpacked
+                # but log it to the standard output
+                print(x_str)
+                return False
+            else:
+                raise x
+
+        return True
+
+
+    @staticmethod
+    def get_directory_size(directory:str) -> int:
+        size = 0
+
+        for iroot, idirs, ifiles in os.walk(directory):
+            for ifile in ifiles:
+                try:
+                    size += os.lstat(os.path.join(iroot, ifile)).st_size
+                except OSError:
+                    pass
+
+        return size
 
 
     @staticmethod
@@ -573,683 +799,2256 @@ class Utils:
         return None
 
 
+class ArchiveNotSupportedException(Exception):
+    pass
+
+
 @typechecked_class_decorator()
-class Emulator:
-    re_cue_bin_sign = re.compile(r'^FILE\ \"(.*)\"\ BINARY$')
-    re_similar_rom_sign = re.compile(r'\(Disk\ \d\ of\ \d\)')
-    re_fixup_game_title_3 = re.compile(r'([A-Z][a-z]*)')
+class ArchiveExtractor(abc.ABC):
+    # in-process unpacking of archives, register subclasses
+    # with ArchiveExtractor.register() to support more types
+    extractors = []
+    name = ''
+    extensions = []
 
 
-    def __init__(self,
-        system_name: str,
-        emulator_name: str,
-        emulator_url: str,
-        exe_paths: List[str],
-        gui_paths: List[str],
-        raw_exe_paths: List[str],
-        run_patterns: List[str],
-        roms_path: str,
-        raw_roms_path: str,
-        run_patterns_roms_extensions: List[List[str]],
-        run_patterns_pre_commands: List[List],
-        rom_name_remove: List[str],
-        internal_name: str,
-        rom_basename_ignore: List[str],
-        # globals:
-        bios_path: str,
-        custom_data: dict,
-        fix_game_title: bool,
-        fix_game_title2: bool,
-        fix_game_title3: bool,
-        unpack_to_tmp: bool
-    ):
-        self.system_name = system_name
-        self.emulator_name = emulator_name
-        self.emulator_url = emulator_url
-        self.exe_paths = exe_paths
-        self.gui_paths = gui_paths
-        self.raw_exe_paths = raw_exe_paths
-        self.run_patterns = run_patterns
-        self.roms_path = roms_path
-        self.raw_roms_path = raw_roms_path
-        self.rom_name_remove = rom_name_remove
-        self.run_patterns_roms_extensions = run_patterns_roms_extensions
-        self.run_patterns_pre_commands = run_patterns_pre_commands
-        self.internal_name = internal_name
-        self.rom_basename_ignore = rom_basename_ignore
-        self.bios_path = bios_path
-        self.custom_data = custom_data
-        self.fix_game_title = fix_game_title
-        self.fix_game_title2 = fix_game_title2
-        self.fix_game_title3 = fix_game_title3
-        self.unpack_to_tmp = unpack_to_tmp
-        self._cached_roms = None
-        self._cached_exe_pathname = None
-        self._cached_gui_exe_pathname = None
-        self._cached_roms_pathname = None
-        self._cached_bios_pathname = None
+    @staticmethod
+    def register(extractor:'ArchiveExtractor'):
+        ArchiveExtractor.extractors.append(extractor)
 
-        self._roms_config = self._parse_roms_config()
 
+    @staticmethod
+    def find_extractor(archive_pathname:str) -> Optional['ArchiveExtractor']:
+        ext = os.path.splitext(archive_pathname)[1].lower()
 
-    def get_full_roms_path(self) -> Optional[str]:
-        if not os.path.exists(self.roms_path):
-            return None
+        for iextractor in ArchiveExtractor.extractors:
+            if ext in iextractor.extensions and iextractor.is_available():
+                return iextractor
 
-        return os.path.realpath(self.roms_path)
+        return None
 
 
-    def _get_cue_bins(self, cue_pathname: str) -> list:
-        bins = []
+    def is_available(self) -> bool:
+        return True
 
-        for iline in Utils.file_extract_lines(cue_pathname):
-            iline = iline.strip()
 
-            match = Emulator.re_cue_bin_sign.findall(iline)
+    @abc.abstractmethod
+    def extract(self, archive_pathname:str, outdir:str) -> bool:
+        # implemented by subclasses, False when archive is broken,
+        # ArchiveNotSupportedException to unpack it with patool
+        pass
 
-            if len(match) == 1:
-                bin_filename = match[0]
 
-                if bin_filename not in bins:
-                    bins.append(bin_filename)
+    def get_member_pathname(self, outdir:str, member_name:str) -> Optional[str]:
+        parts = [ipart for ipart in re.split(r'[\\/]+', member_name) if ipart and ipart != '.']
 
-        return bins
+        if not parts or '..' in parts or os.path.isabs(member_name) or ':' in parts[0]:
+            # do not write outside of outdir
+            return None
 
+        return os.path.join(outdir, *parts)
 
-    def _raise_no_exe_exception(self):
-        raise Exception('No emulator executable for {system_name} ({emulator_name}) found'.format(
-            system_name=self.system_name,
-            emulator_name=self.emulator_name
-        ))
 
+    def write_member(self, pathname:str, source:io.IOBase, mtime:Optional[float]):
+        os.makedirs(os.path.dirname(pathname), exist_ok=True)
 
-    def _raise_no_rom_run_pattern_exception(self, rom_path:str):
-        raise Exception('No run pattern found for rom {rom_path}'.format(
-            rom_path=rom_path
-        ))
+        with open(pathname, 'wb', buffering=UNPACK_BUFFER_SIZE) as f:
+            shutil.copyfileobj(source, f, UNPACK_BUFFER_SIZE)
 
+        if mtime is not None:
+            os.utime(pathname, (mtime, mtime))
 
-    def get_emulator_executable(self, cached: bool = True) -> Optional[str]:
-        if cached and self._cached_exe_pathname is not None:
-            return self._cached_exe_pathname
 
-        exe_pathname = None
+@typechecked_class_decorator()
+class ZipArchiveExtractor(ArchiveExtractor):
+    name = 'zipfile'
+    extensions = ['.zip']
 
-        for ipath2 in self.exe_paths:
-            ipath2_full_pathname = ipath2
 
-            exists = glob.glob(ipath2_full_pathname)
+    def extract(self, archive_pathname:str, outdir:str) -> bool:
+        try:
+            with zipfile.ZipFile(archive_pathname) as archive:
+                for iinfo in archive.infolist():
+                    pathname = self.get_member_pathname(outdir, iinfo.filename)
 
-            if len(exists) and os.path.isfile(exists[0]):
-                exe_pathname = os.path.realpath(exists[0])
-                break
+                    if not pathname:
+                        print('Skipping archive member {name}'.format(name=iinfo.filename))
+                        continue
 
-            ipath2_basename = os.path.basename(ipath2)
+                    if iinfo.is_dir():
+                        os.makedirs(pathname, exist_ok=True)
+                        continue
 
-            ipath2_basename_system = shutil.which(ipath2_basename)
+                    # opening it would need a password
+                    if iinfo.flag_bits & 0x1:
+                        raise ArchiveNotSupportedException('encrypted member {name}'.format(name=iinfo.filename))
 
-            if ipath2_basename_system:
-                exe_pathname = ipath2_basename_system
-                break
+                    try:
+                        source = archive.open(iinfo)
+                    except NotImplementedError as x:
+                        # compression method zipfile does not support
+                        raise ArchiveNotSupportedException(str(x))
 
-            ipath2_full_pathname = ipath2_basename
+                    with source:
+                        self.write_member(pathname, source, time.mktime(iinfo.date_time + (0, 0, -1)))
+        except (zipfile.BadZipFile, zlib.error, EOFError) as x:
+            print('Cannot unpack {archive}: {error}'.format(archive=archive_pathname, error=str(x)))
+            return False
 
-            exists = glob.glob(ipath2_full_pathname)
+        return True
 
-            if len(exists) and os.path.isfile(exists[0]):
-                exe_pathname = os.path.realpath(exists[0])
-                break
 
-        self._cached_exe_pathname = exe_pathname
+@typechecked_class_decorator()
+class LhaArchiveExtractor(ArchiveExtractor):
+    name = 'lhafile'
+    extensions = ['.lha', '.lzh']
 
-        return exe_pathname
 
+    def is_available(self) -> bool:
+        try:
+            # optional, lha archives are unpacked by patool without it
+            import lhafile
+        except ImportError:
+            return False
 
-    def _get_gui_executable(self, cached: bool = True) -> Optional[str]:
-        if cached and self._cached_gui_exe_pathname is not None:
-            return self._cached_gui_exe_pathname
+        return True
 
-        exe_pathname = None
 
-        for ipath2 in self.gui_paths:
-            ipath2_full_pathname = ipath2
+    def extract(self, archive_pathname:str, outdir:str) -> bool:
+        import lhafile
 
-            exists = glob.glob(ipath2_full_pathname)
+        try:
+            with open(archive_pathname, 'rb') as f:
+                archive = lhafile.LhaFile(f)
 
-            if len(exists) and os.path.isfile(exists[0]):
-                exe_pathname = os.path.realpath(exists[0])
-                break
+                for iinfo in archive.infolist():
+                    pathname = self.get_member_pathname(outdir, iinfo.filename)
 
-            ipath2_basename = os.path.basename(ipath2)
+                    if not pathname:
+                        print('Skipping archive member {name}'.format(name=iinfo.filename))
+                        continue
 
-            ipath2_basename_system = shutil.which(ipath2_basename)
+                    if iinfo.compress_type == b'-lhd-':
+                        os.makedirs(pathname, exist_ok=True)
+                        continue
 
-            if ipath2_basename_system:
-                exe_pathname = ipath2_basename_system
-                break
+                    if iinfo.compress_type not in lhafile.LhaFile.SUPPORTED_COMPRESS_TYPE:
+                        raise ArchiveNotSupportedException('unsupported compression {compress_type}'.format(
+                            compress_type=iinfo.compress_type.decode('ascii', 'replace')
+                        ))
 
-            ipath2_full_pathname = ipath2_basename
+                    self._write_lha_member(f, iinfo, pathname)
+        except lhafile.BadLhafile as x:
+            print('Cannot unpack {archive}: {error}'.format(archive=archive_pathname, error=str(x)))
+            return False
 
-            exists = glob.glob(ipath2_full_pathname)
+        return True
 
-            if len(exists) and os.path.isfile(exists[0]):
-                exe_pathname = os.path.realpath(exists[0])
-                break
 
-        self._cached_gui_exe_pathname = exe_pathname
+    def _write_lha_member(self, archive_file:io.IOBase, info, pathname:str):
+        # LhaFile.read() gives whole member in memory, its decoder
+        # writes straight to the file instead, only compressed
+        # data of the member is read into memory
+        import lhafile
 
-        return exe_pathname
+        archive_file.seek(info.file_offset)
+        source = io.BytesIO(archive_file.read(info.compress_size))
 
+        os.makedirs(os.path.dirname(pathname), exist_ok=True)
 
-    def get_gui_executable(self, cached: bool = True) -> Optional[str]:
-        exe_pathname = self._get_gui_executable(cached)
+        with open(pathname, 'wb', buffering=UNPACK_BUFFER_SIZE) as f:
+            session = lhafile.lzhlib.LZHDecodeSession(source, f, info)
 
-        if exe_pathname:
-            return exe_pathname
+            while not session.do_next():
+                pass
 
-        return self.get_emulator_executable(cached)
+        if session.output_pos != info.file_size or session.crc16 != info.CRC:
+            raise lhafile.BadLhafile('{name} is broken'.format(name=info.filename))
 
+        mtime = info.date_time.timestamp()
+        os.utime(pathname, (mtime, mtime))
 
-    def _ignore_file(self, filename:str) -> bool:
-        for ipattern in self.rom_basename_ignore:
-            if fnmatch.fnmatch(filename, ipattern):
-                return True
 
-        return False
+ArchiveExtractor.register(ZipArchiveExtractor())
+ArchiveExtractor.register(LhaArchiveExtractor())
 
 
-    def _parse_roms_config(self) -> Optional[ConfigParser]:
-        roms_path = self.get_full_roms_path()
+@typechecked_class_decorator()
+class RomsList:
+    def __init__(self, roms:dict):
+        # built once per scan, rows are addressed by index
+        self.pathnames = list(roms.keys())
+        self.names = list(roms.values())
+        self._rows = None
 
-        if not roms_path:
+
+    def __len__(self) -> int:
+        return len(self.pathnames)
+
+
+    def extend(self, roms_list:'RomsList'):
+        self.pathnames.extend(roms_list.pathnames)
+        self.names.extend(roms_list.names)
+        self._rows = None
+
+
+    def get_pathname(self, row:int) -> Optional[str]:
+        if row < 0 or row >= len(self.pathnames):
             return None
 
-        roms_ini_path = os.path.join(roms_path, DEFAULT_ROMS_PATHNAME)
+        return self.pathnames[row]
 
-        if not os.path.exists(roms_ini_path):
+
+    def get_name(self, row:int) -> Optional[str]:
+        if row < 0 or row >= len(self.names):
             return None
 
-        config = ConfigParser()
-        config.read_string(open(roms_ini_path).read())
+        return self.names[row]
 
-        return config
 
+    def get_row(self, pathname:str) -> int:
+        if self._rows is None:
+            self._rows = {ipathname: irow for irow, ipathname in enumerate(self.pathnames)}
 
-    def _find_rom_config(self, rom_path:str) -> Optional[dict]:
-        if not self._roms_config:
-            return None
+        return self._rows.get(pathname, -1)
 
-        rom_path = rom_path.lower()
-        rom_basename = os.path.basename(rom_path)
 
-        if rom_basename in self._roms_config.sections():
-            return dict(self._roms_config[rom_basename])
+@typechecked_class_decorator()
+class RomsIndex:
+    def __init__(self, pathname:str):
+        self.pathname = pathname
+        self._lock = threading.Lock()
+
+        self._execute('CREATE TABLE IF NOT EXISTS roms_index (internal_name TEXT PRIMARY KEY, data TEXT NOT NULL)')
+
 
-        if rom_path in self._roms_config.sections():
-            return dict(self._roms_config[rom_path])
+    def _execute(self, sql:str, parameters:tuple = ()) -> Optional[list]:
+        with self._lock:
+            try:
+                connection = sqlite3.connect(self.pathname, timeout=10)
 
-        for ikey in self._roms_config.sections():
-            lower_ikey = ikey.lower()
+                try:
+                    # it is only a cache, it can be rebuilt any time
+                    connection.execute('PRAGMA synchronous = OFF')
 
-            if fnmatch.fnmatch(rom_path, lower_ikey) or fnmatch.fnmatch(rom_basename, lower_ikey):
-                return dict(self._roms_config[ikey])
+                    with connection:
+                        return connection.execute(sql, parameters).fetchall()
+                finally:
+                    connection.close()
+            except sqlite3.Error as x:
+                print('Roms index {pathname} error: {error}'.format(pathname=self.pathname, error=str(x)))
 
         return None
 
 
-    def _get_emulator_roms(self, roms_extensions:list) -> Optional[dict]:
-        roms_path = self.get_full_roms_path()
-        roms = {}
-        to_skip = []
+    def load(self, internal_name:str) -> Optional[dict]:
+        rows = self._execute('SELECT data FROM roms_index WHERE internal_name = ?', (internal_name,))
 
-        if not roms_path or not os.path.exists(roms_path):
+        if not rows:
             return None
 
-        files = sorted(list(pathlib.Path(roms_path).rglob('*')))
+        return json.loads(rows[0][0])
 
-        for iextension in roms_extensions:
-            for ifile in files:
-                ifile_pathname = str(ifile)
 
-                if os.path.isdir(ifile_pathname):
-                    continue
+    def save(self, internal_name:str, data:dict):
+        self._execute(
+            'INSERT OR REPLACE INTO roms_index (internal_name, data) VALUES (?, ?)',
+            (internal_name, json.dumps(data))
+        )
 
-                if ifile_pathname in roms:
-                    continue
 
-                if ifile.name.startswith('.'):
-                    continue
+@typechecked_class_decorator()
+class UnpackCache:
+    def __init__(self, cache_path:str, max_size:int):
+        # unpacked archives are kept in cache_path/<internal_name>/<entry>,
+        # entry is complete only when its marker file exists, least recently
+        # used entries are removed when their size exceeds max_size bytes
+        self.cache_path = cache_path
+        self.max_size = max_size
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._evict_lock = threading.Lock()
+        self._entries_locks = {}
+        self._in_use_pathnames = set()
+        self._orphans_removed = False
 
-                if self._ignore_file(ifile.name):
-                    continue
+        # entry pathname -> [last used, size], markers are read
+        # from disk once, then it is kept up to date in memory
+        self._entries = None
 
-                lower_filename = ifile.name.lower()
 
-                if not fnmatch.fnmatch(lower_filename, iextension):
-                    continue
+    def _get_entry_lock(self, entry_pathname:str) -> threading.Lock:
+        with self._lock:
+            return self._entries_locks.setdefault(entry_pathname, threading.Lock())
 
-                rom_config = self._find_rom_config(ifile_pathname)
 
-                if rom_config and 'hide' in rom_config and rom_config['hide'] == '1':
-                    continue
+    def get_entry_pathname(self, internal_name:str, archive_pathname:str) -> str:
+        archive_stat = os.stat(archive_pathname)
+        archive_key = '{pathname}|{size}|{mtime}'.format(
+            pathname=os.path.normcase(os.path.abspath(archive_pathname)),
+            size=archive_stat.st_size,
+            mtime=archive_stat.st_mtime_ns
+        )
 
-                if rom_config and 'main_rom' in rom_config and rom_config['main_rom']:
-                    if rom_config['main_rom'] != ifile.name:
-                        continue
+        (rom_filename, ext) = os.path.splitext(os.path.basename(archive_pathname))
+        entry_name = '{rom_filename}_{key_hash}'.format(
+            rom_filename=rom_filename,
+            key_hash=hashlib.sha1(archive_key.encode('utf-8')).hexdigest()[:16]
+        )
 
-                clean_name = ifile_pathname.replace(roms_path + os.path.sep, '', 1).split(os.path.sep)[0]
-                (clean_name, ext) = os.path.splitext(clean_name)
+        return os.path.join(self.cache_path, internal_name, entry_name)
 
-                if iextension == '*.cue':
-                    to_skip = list(set(to_skip) | set(self._get_cue_bins(ifile_pathname)))
-                elif iextension == '*.ccd':
-                    img_filename = clean_name + '.img'
 
-                    if img_filename not in to_skip:
-                        to_skip.append(img_filename)
+    def is_unpacked(self, entry_pathname:str) -> bool:
+        return os.path.isfile(entry_pathname + UNPACK_CACHE_MARKER_EXTENSION) and os.path.isdir(entry_pathname)
 
-                if ifile.name in to_skip:
-                    continue
 
-                for ire in self.rom_name_remove:
-                    if not ire:
-                        continue
+    def unpack(self, internal_name:str, archive_pathname:str, native:bool = True, in_use:bool = False) -> str:
+        # in_use entries (of running game) are not evicted
+        # until release_in_use() is called
+        entry_pathname = self.get_entry_pathname(internal_name, archive_pathname)
+        marker_pathname = entry_pathname + UNPACK_CACHE_MARKER_EXTENSION
 
-                    clean_name = re.sub(ire, '', clean_name)
+        if in_use:
+            with self._lock:
+                self._in_use_pathnames.add(entry_pathname)
 
-                if rom_config and 'title' in rom_config:
-                    clean_name = rom_config['title']
+        with self._get_entry_lock(entry_pathname):
+            if self.is_unpacked(entry_pathname):
+                # marker mtime is the last use time
+                os.utime(marker_pathname)
 
-                roms[ifile_pathname] = clean_name.strip()
+                with self._lock:
+                    self.hits += 1
 
-        return roms
+                self._touch_entry(entry_pathname)
 
+                print('Unpack cache hit: {archive} ({hits} hits, {misses} misses)'.format(
+                    archive=archive_pathname,
+                    hits=self.hits,
+                    misses=self.misses
+                ))
 
-    def _fixup_game_titles(self, roms:dict) -> dict:
-        for pathname in roms.copy():
+                return entry_pathname
+
+            with self._lock:
+                self.misses += 1
+
+            start_time = time.perf_counter()
+
+            # leftovers of interrupted or failed unpacking
+            partial_pathname = entry_pathname + '.partial'
+
+            for ipathname in [entry_pathname, partial_pathname]:
+                if os.path.exists(ipathname):
+                    shutil.rmtree(ipathname, ignore_errors=True)
+
+            os.makedirs(partial_pathname)
+
+            if not Utils.extract_archive(archive_pathname, partial_pathname, native):
+                shutil.rmtree(partial_pathname, ignore_errors=True)
+
+                raise Exception('Cannot unpack ' + archive_pathname)
+
+            os.replace(partial_pathname, entry_pathname)
+
+            self._write_marker(marker_pathname, {
+                'archive': archive_pathname,
+                'size': Utils.get_directory_size(entry_pathname)
+            })
+
+            print('Unpack cache miss: {archive} unpacked in {time:.3f}s ({hits} hits, {misses} misses)'.format(
+                archive=archive_pathname,
+                time=time.perf_counter() - start_time,
+                hits=self.hits,
+                misses=self.misses
+            ))
+
+        self._evict(entry_pathname)
+
+        return entry_pathname
+
+
+    def release_in_use(self):
+        with self._lock:
+            self._in_use_pathnames.clear()
+
+
+    def _write_marker(self, marker_pathname:str, data:dict):
+        tmp_pathname = '{pathname}.{pid}.{tid}.tmp'.format(
+            pathname=marker_pathname,
+            pid=os.getpid(),
+            tid=threading.get_ident()
+        )
+
+        with open(tmp_pathname, 'w') as f:
+            json.dump(data, f)
+
+        os.replace(tmp_pathname, marker_pathname)
+
+        self._load_entries()
+
+        with self._lock:
+            entry_pathname = marker_pathname[:-len(UNPACK_CACHE_MARKER_EXTENSION)]
+            old_entry = self._entries.get(entry_pathname)
+
+            # loaded from disk already
+            if old_entry:
+                self.size -= old_entry[1]
+
+            self._entries[entry_pathname] = [time.time(), data['size']]
+            self.size += data['size']
+
+
+    def _load_entries(self):
+        with self._lock:
+            if self._entries is not None:
+                return
+
+            self._entries = {}
+
+            for imarker_pathname in glob.glob(os.path.join(glob.escape(self.cache_path), '*', '*' + UNPACK_CACHE_MARKER_EXTENSION)):
+                try:
+                    last_used = os.stat(imarker_pathname).st_mtime
+
+                    with open(imarker_pathname, 'r') as f:
+                        size = int(json.load(f)['size'])
+                except (OSError, ValueError, KeyError, TypeError):
+                    continue
+
+                self._entries[imarker_pathname[:-len(UNPACK_CACHE_MARKER_EXTENSION)]] = [last_used, size]
+                self.size += size
+
+
+    def _touch_entry(self, entry_pathname:str):
+        self._load_entries()
+
+        with self._lock:
+            entry = self._entries.get(entry_pathname)
+
+            if entry:
+                entry[0] = time.time()
+
+
+    def _remove_entry(self, entry_pathname:str):
+        with self._lock:
+            entry = self._entries.pop(entry_pathname, None)
+
+            if entry:
+                self.size -= entry[1]
+
+
+    def is_full(self) -> bool:
+        if not self.max_size:
+            return False
+
+        self._load_entries()
+
+        return self.size >= self.max_size
+
+
+    def _remove_orphans(self):
+        # entries without marker and .partial directories are left by
+        # crashes or older versions, they are not counted by _load_entries
+        for ipathname in glob.glob(os.path.join(glob.escape(self.cache_path), '*', '*')):
+            if not os.path.isdir(ipathname):
+                continue
+
+            if ipathname.endswith('.partial'):
+                entry_pathname = ipathname[:-len('.partial')]
+            elif os.path.exists(ipathname + UNPACK_CACHE_MARKER_EXTENSION):
+                continue
+            else:
+                entry_pathname = ipathname
+
+            entry_lock = self._get_entry_lock(entry_pathname)
+
+            # being unpacked at the moment
+            if not entry_lock.acquire(False):
+                continue
+
+            try:
+                if ipathname == entry_pathname and os.path.exists(ipathname + UNPACK_CACHE_MARKER_EXTENSION):
+                    continue
+
+                shutil.rmtree(ipathname, ignore_errors=True)
+                print('Unpack cache: removed {pathname}'.format(pathname=ipathname))
+            finally:
+                entry_lock.release()
+
+
+    def _evict(self, keep_pathname:str):
+        with self._evict_lock:
+            if not self._orphans_removed:
+                self._orphans_removed = True
+                self._remove_orphans()
+
+            if not self.max_size:
+                return
+
+            self._load_entries()
+
+            with self._lock:
+                entries = sorted((ientry[0], ientry_pathname) for ientry_pathname, ientry in self._entries.items())
+
+            for ilast_used, ientry_pathname in entries:
+                if self.size <= self.max_size:
+                    break
+
+                with self._lock:
+                    in_use = ientry_pathname in self._in_use_pathnames
+
+                if ientry_pathname == keep_pathname or in_use:
+                    continue
+
+                with self._get_entry_lock(ientry_pathname):
+                    try:
+                        # without marker the entry is not used anymore
+                        os.remove(ientry_pathname + UNPACK_CACHE_MARKER_EXTENSION)
+                    except FileNotFoundError:
+                        self._remove_entry(ientry_pathname)
+                        continue
+
+                    shutil.rmtree(ientry_pathname, ignore_errors=True)
+
+                self._remove_entry(ientry_pathname)
+                print('Unpack cache: removed {pathname}'.format(pathname=ientry_pathname))
+
+
+class LaunchCancelledException(Exception):
+    pass
+
+
+@typechecked_class_decorator()
+class LaunchProgress:
+    def __init__(self, stage_started = None):
+        # stage_started(stage) is called from the launching thread,
+        # cancel() stops the launch before its next stage
+        self.stage_started = stage_started
+        self.cancelled = False
+        self._start_time = time.perf_counter()
+        self._stage = None
+        self._stage_start_time = None
+
+
+    def cancel(self):
+        self.cancelled = True
+
+
+    def start_stage(self, stage:str):
+        self._finish_stage()
+
+        if self.cancelled:
+            raise LaunchCancelledException('Launch cancelled')
+
+        self._stage = stage
+        self._stage_start_time = time.perf_counter()
+
+        if self.stage_started:
+            self.stage_started(stage)
+
+
+    def _finish_stage(self):
+        if not self._stage:
+            return
+
+        print('Launch stage {stage} took {time:.3f}s'.format(
+            stage=self._stage,
+            time=time.perf_counter() - self._stage_start_time
+        ))
+
+        self._stage = None
+
+
+    def finish(self):
+        self._finish_stage()
+
+        print('Emulator started in {time:.3f}s'.format(time=time.perf_counter() - self._start_time))
+
+
+@typechecked_class_decorator()
+class Emulator:
+    re_cue_bin_sign = re.compile(r'^FILE\ \"(.*)\"\ BINARY$')
+    re_similar_rom_sign = re.compile(r'\(Disk\ \d\ of\ \d\)')
+    re_fixup_game_title_3 = re.compile(r'([A-Z][a-z]*)')
+
+
+    def __init__(self,
+        system_name: str,
+        emulator_name: str,
+        emulator_url: str,
+        exe_paths: List[str],
+        gui_paths: List[str],
+        raw_exe_paths: List[str],
+        run_patterns: List[str],
+        roms_path: str,
+        raw_roms_path: str,
+        run_patterns_roms_extensions: List[List[str]],
+        run_patterns_pre_commands: List[List],
+        rom_name_remove: List[str],
+        internal_name: str,
+        rom_basename_ignore: List[str],
+        # globals:
+        bios_path: str,
+        custom_data: dict,
+        fix_game_title: bool,
+        fix_game_title2: bool,
+        fix_game_title3: bool,
+        unpack_to_tmp: bool,
+        unpack_native: bool,
+        roms_index: Optional[RomsIndex],
+        unpack_cache: Optional[UnpackCache]
+    ):
+        self.system_name = system_name
+        self.emulator_name = emulator_name
+        self.emulator_url = emulator_url
+        self.exe_paths = exe_paths
+        self.gui_paths = gui_paths
+        self.raw_exe_paths = raw_exe_paths
+        self.run_patterns = run_patterns
+        self.roms_path = roms_path
+        self.raw_roms_path = raw_roms_path
+        self.rom_name_remove = rom_name_remove
+        self._rom_name_remove_res = [re.compile(ire) for ire in rom_name_remove if ire]
+        self.run_patterns_roms_extensions = run_patterns_roms_extensions
+        self.run_patterns_pre_commands = run_patterns_pre_commands
+        self.internal_name = internal_name
+        self.rom_basename_ignore = rom_basename_ignore
+        self.bios_path = bios_path
+        self.custom_data = custom_data
+        self.fix_game_title = fix_game_title
+        self.fix_game_title2 = fix_game_title2
+        self.fix_game_title3 = fix_game_title3
+        self.unpack_to_tmp = unpack_to_tmp
+        self.unpack_native = unpack_native
+        self.roms_index = roms_index
+        self.unpack_cache = unpack_cache
+        self._roms_lock = threading.RLock()
+        self._cached_roms = None
+        self._cached_roms_list = None
+        self._roms_directories = {}
+        self._roms_files = {}
+        self._roms_files_fingerprint = None
+        self._cue_bins = {}
+        self._fixed_game_titles = {}
+        self._cached_exe_pathname = None
+        self._cached_gui_exe_pathname = None
+        self._cached_roms_pathname = None
+        self._cached_bios_pathname = None
+
+        self._load_roms_config()
+
+
+    def get_full_roms_path(self) -> Optional[str]:
+        if not os.path.exists(self.roms_path):
+            return None
+
+        return os.path.realpath(self.roms_path)
+
+
+    def _get_cue_bins(self, cue_pathname: str) -> list:
+        bins = []
+
+        for iline in Utils.file_extract_lines(cue_pathname):
+            iline = iline.strip()
+
+            match = Emulator.re_cue_bin_sign.findall(iline)
+
+            if len(match) == 1:
+                bin_filename = match[0]
+
+                if bin_filename not in bins:
+                    bins.append(bin_filename)
+
+        return bins
+
+
+    def _get_cached_cue_bins(self, cue_pathname: str) -> list:
+        mtime = os.stat(cue_pathname).st_mtime_ns
+
+        if cue_pathname not in self._cue_bins or self._cue_bins[cue_pathname][0] != mtime:
+            self._cue_bins[cue_pathname] = (mtime, self._get_cue_bins(cue_pathname))
+
+        return self._cue_bins[cue_pathname][1]
+
+
+    def _raise_no_exe_exception(self):
+        raise Exception('No emulator executable for {system_name} ({emulator_name}) found'.format(
+            system_name=self.system_name,
+            emulator_name=self.emulator_name
+        ))
+
+
+    def _raise_no_rom_run_pattern_exception(self, rom_path:str):
+        raise Exception('No run pattern found for rom {rom_path}'.format(
+            rom_path=rom_path
+        ))
+
+
+    def get_emulator_executable(self, cached: bool = True) -> Optional[str]:
+        if cached and self._cached_exe_pathname is not None:
+            return self._cached_exe_pathname
+
+        exe_pathname = None
+
+        for ipath2 in self.exe_paths:
+            ipath2_full_pathname = ipath2
+
+            exists = glob.glob(ipath2_full_pathname)
+
+            if len(exists) and os.path.isfile(exists[0]):
+                exe_pathname = os.path.realpath(exists[0])
+                break
+
+            ipath2_basename = os.path.basename(ipath2)
+
+            ipath2_basename_system = shutil.which(ipath2_basename)
+
+            if ipath2_basename_system:
+                exe_pathname = ipath2_basename_system
+                break
+
+            ipath2_full_pathname = ipath2_basename
+
+            exists = glob.glob(ipath2_full_pathname)
+
+            if len(exists) and os.path.isfile(exists[0]):
+                exe_pathname = os.path.realpath(exists[0])
+                break
+
+        self._cached_exe_pathname = exe_pathname
+
+        return exe_pathname
+
+
+    def _get_gui_executable(self, cached: bool = True) -> Optional[str]:
+        if cached and self._cached_gui_exe_pathname is not None:
+            return self._cached_gui_exe_pathname
+
+        exe_pathname = None
+
+        for ipath2 in self.gui_paths:
+            ipath2_full_pathname = ipath2
+
+            exists = glob.glob(ipath2_full_pathname)
+
+            if len(exists) and os.path.isfile(exists[0]):
+                exe_pathname = os.path.realpath(exists[0])
+                break
+
+            ipath2_basename = os.path.basename(ipath2)
+
+            ipath2_basename_system = shutil.which(ipath2_basename)
+
+            if ipath2_basename_system:
+                exe_pathname = ipath2_basename_system
+                break
+
+            ipath2_full_pathname = ipath2_basename
+
+            exists = glob.glob(ipath2_full_pathname)
+
+            if len(exists) and os.path.isfile(exists[0]):
+                exe_pathname = os.path.realpath(exists[0])
+                break
+
+        self._cached_gui_exe_pathname = exe_pathname
+
+        return exe_pathname
+
+
+    def get_gui_executable(self, cached: bool = True) -> Optional[str]:
+        exe_pathname = self._get_gui_executable(cached)
+
+        if exe_pathname:
+            return exe_pathname
+
+        return self.get_emulator_executable(cached)
+
+
+    def _ignore_file(self, filename:str) -> bool:
+        for ipattern in self.rom_basename_ignore:
+            if fnmatch.fnmatch(filename, ipattern):
+                return True
+
+        return False
+
+
+    def _get_roms_config_mtime(self) -> Optional[int]:
+        roms_path = self.get_full_roms_path()
+
+        if not roms_path:
+            return None
+
+        roms_ini_path = os.path.join(roms_path, DEFAULT_ROMS_PATHNAME)
+
+        if not os.path.exists(roms_ini_path):
+            return None
+
+        return os.stat(roms_ini_path).st_mtime_ns
+
+
+    def _parse_roms_config(self) -> Optional[ConfigParser]:
+        roms_path = self.get_full_roms_path()
+
+        if not roms_path:
+            return None
+
+        roms_ini_path = os.path.join(roms_path, DEFAULT_ROMS_PATHNAME)
+
+        if not os.path.exists(roms_ini_path):
+            return None
+
+        config = ConfigParser()
+        config.read_string(open(roms_ini_path).read())
+
+        return config
+
+
+    def _translate_roms_config_section(self, section_name:str) -> str:
+        pattern = fnmatch.translate(os.path.normcase(section_name.lower()))
+
+        if pattern.endswith('\\Z'):
+            pattern = pattern[:-2]
+
+        return pattern
+
+
+    def _load_roms_config(self):
+        self._roms_config = self._parse_roms_config()
+        self._roms_config_sections = {}
+        self._roms_config_matcher = None
+        self._roms_config_matcher_sections = {}
+
+        if not self._roms_config:
+            return
+
+        patterns = []
+
+        for isection_index, isection_name in enumerate(self._roms_config.sections()):
+            # translate twice, older Pythons put named groups in
+            # the translated pattern, these cannot be repeated
+            path_pattern = self._translate_roms_config_section(isection_name)
+            basename_pattern = self._translate_roms_config_section(isection_name)
+
+            # matched against "<rom path>\x00<rom basename>", so the section
+            # matches either whole rom path or whole rom basename
+            patterns.append('(?P<s{index}>{path_pattern}\\x00|[^\\x00]*\\x00{basename_pattern}\\Z)'.format(
+                index=isection_index,
+                path_pattern=path_pattern,
+                basename_pattern=basename_pattern
+            ))
+
+            self._roms_config_sections[isection_name] = dict(self._roms_config[isection_name])
+
+        # alternatives are tried in order, so the first matching section wins
+        self._roms_config_matcher = re.compile('|'.join(patterns))
+
+        for isection_index, isection_name in enumerate(self._roms_config.sections()):
+            group_index = self._roms_config_matcher.groupindex['s' + str(isection_index)]
+
+            self._roms_config_matcher_sections[group_index] = self._roms_config_sections[isection_name]
+
+
+    def _find_rom_config(self, rom_path:str) -> Optional[dict]:
+        if not self._roms_config:
+            return None
+
+        rom_path = rom_path.lower()
+        rom_basename = os.path.basename(rom_path)
+
+        if rom_basename in self._roms_config_sections:
+            return self._roms_config_sections[rom_basename]
+
+        if rom_path in self._roms_config_sections:
+            return self._roms_config_sections[rom_path]
+
+        if not self._roms_config_sections:
+            return None
+
+        match = self._roms_config_matcher.match(os.path.normcase(rom_path) + '\x00' + os.path.normcase(rom_basename))
+
+        if not match:
+            return None
+
+        return self._roms_config_matcher_sections[match.lastindex]
+
+
+    def _scan_roms_directory(self, directory_pathname:str, directories:dict, previous_directories:dict):
+        # walk in the same order as sorted(pathlib.Path(...).rglob('*'))
+        # and yield (pathname, name) of files as they are found,
+        # file type comes from DirEntry so no extra stat() is needed
+        try:
+            mtime = os.stat(directory_pathname).st_mtime_ns
+        except OSError:
+            return
+
+        previous_directory = previous_directories.get(directory_pathname)
+
+        if previous_directory and previous_directory[0] == mtime:
+            # directory not changed since last scan, reuse its listing
+            sorted_entries = previous_directory[1]
+        else:
+            try:
+                with os.scandir(directory_pathname) as entries:
+                    sorted_entries = sorted([
+                        # like rglob, do not descend into symlinked directories
+                        (ientry.name, ientry.is_dir() and not ientry.is_symlink())
+                        for ientry in entries
+                        if not ientry.is_dir() or not ientry.is_symlink()
+                    ], key=lambda ientry: os.path.normcase(ientry[0]))
+            except PermissionError:
+                return
+
+        if time.time() - mtime / 1e9 < ROMS_INDEX_MTIME_RESOLUTION:
+            # directory changed just now, another change may still
+            # happen within the same mtime tick, so do not trust it later
+            mtime = -1
+
+        directories[directory_pathname] = (mtime, sorted_entries)
+
+        for (iname, iis_directory) in sorted_entries:
+            ipathname = os.path.join(directory_pathname, iname)
+
+            if iis_directory:
+                yield from self._scan_roms_directory(ipathname, directories, previous_directories)
+            else:
+                yield (ipathname, iname)
+
+
+    def get_roms_directories(self) -> List[str]:
+        # directories visited by the last scan
+        return list(self._roms_directories.keys())
+
+
+    def _is_roms_directories_changed(self, directories:dict) -> bool:
+        for idirectory_pathname, idirectory in directories.items():
+            try:
+                if os.stat(idirectory_pathname).st_mtime_ns != idirectory[0]:
+                    return True
+            except OSError:
+                return True
+
+        return False
+
+
+    def clean_rom_name(self, name:str) -> str:
+        # patterns are applied one after another, merging them into
+        # one alternation would not give the same result in general,
+        # eg. "A (b [c) d]" for \[[^\]]*\] and \(.*\)
+        for ire in self._rom_name_remove_res:
+            name = ire.sub('', name)
+
+        return name
+
+
+    def _scan_rom_file(self, rom_path:str, rom_name:str, roms_path:str, extensions_matchers:list) -> Optional[tuple]:
+        # everything about a single file which does not depend on other files,
+        # kept between scans so unchanged files are not processed again
+        if rom_name.startswith('.'):
+            return None
+
+        if self._ignore_file(rom_name):
+            return None
+
+        lower_filename = os.path.normcase(rom_name.lower())
+
+        matches = tuple(
+            tuple(imatcher_index for imatcher_index, imatcher in enumerate(imatchers) if imatcher(lower_filename))
+            for imatchers in extensions_matchers
+        )
+
+        if not any(matches):
+            return None
+
+        rom_config = self._find_rom_config(rom_path)
+
+        if rom_config and 'hide' in rom_config and rom_config['hide'] == '1':
+            return None
+
+        if rom_config and 'main_rom' in rom_config and rom_config['main_rom']:
+            if rom_config['main_rom'] != rom_name:
+                return None
+
+        raw_name = rom_path.replace(roms_path + os.path.sep, '', 1).split(os.path.sep)[0]
+        (raw_name, ext) = os.path.splitext(raw_name)
+
+        clean_name = self.clean_rom_name(raw_name)
+
+        if rom_config and 'title' in rom_config:
+            clean_name = rom_config['title']
+
+        return (matches, raw_name, clean_name.strip())
+
+
+    def _get_emulator_roms(self, previous_directories:dict, roms_found = None) -> Optional[List[dict]]:
+        roms_path = self.get_full_roms_path()
+        self._roms_directories = {}
+
+        if not roms_path or not os.path.exists(roms_path):
+            return None
+
+        fingerprint = self._get_roms_index_fingerprint()
+
+        if fingerprint != self._roms_files_fingerprint:
+            # settings or roms.ini changed, all files must be processed again
+            self._roms_files = {}
+            self._roms_files_fingerprint = fingerprint
+            self._fixed_game_titles = {}
+
+        extensions_matchers = [
+            [re.compile(fnmatch.translate(os.path.normcase(iextension))).match for iextension in iroms_extensions]
+            for iroms_extensions in self.run_patterns_roms_extensions
+        ]
+
+        # files matching every extension of every run pattern, in scan order
+        extensions_files = [[[] for imatcher in imatchers] for imatchers in extensions_matchers]
+        previous_roms_files = self._roms_files
+        self._roms_files = {}
+
+        # roms_found(roms) is given roms as they are found, before
+        # their titles are fixed up, numbered and sorted, chunks grow
+        # with the count of found roms since the list view lays out
+        # all rows again after each chunk
+        found_roms = {}
+        found_roms_count = 0
+        found_roms_chunk_size = ROMS_SCAN_FIRST_CHUNK_SIZE
+
+        for (ifile_pathname, ifile_name) in self._scan_roms_directory(roms_path, self._roms_directories, previous_directories):
+            if ifile_pathname in previous_roms_files:
+                rom_file = previous_roms_files[ifile_pathname]
+            else:
+                rom_file = self._scan_rom_file(ifile_pathname, ifile_name, roms_path, extensions_matchers)
+
+            self._roms_files[ifile_pathname] = rom_file
+
+            if not rom_file:
+                continue
+
+            (matches, raw_name, clean_name) = rom_file
+
+            if roms_found:
+                found_roms[ifile_pathname] = clean_name
+
+                if len(found_roms) >= found_roms_chunk_size:
+                    roms_found(found_roms)
+
+                    found_roms_count += len(found_roms)
+                    found_roms = {}
+                    found_roms_chunk_size = max(ROMS_SCAN_CHUNK_SIZE, found_roms_count)
+
+            for iextensions_index, imatcher_indexes in enumerate(matches):
+                for imatcher_index in imatcher_indexes:
+                    extensions_files[iextensions_index][imatcher_index].append(
+                        (ifile_pathname, ifile_name, raw_name, clean_name)
+                    )
+
+        roms_list = []
+
+        for iextensions_index, iroms_extensions in enumerate(self.run_patterns_roms_extensions):
+            roms = {}
+            to_skip = set()
+
+            for iextension, iextension_files in zip(iroms_extensions, extensions_files[iextensions_index]):
+                for (ifile_pathname, ifile_name, raw_name, clean_name) in iextension_files:
+                    if ifile_pathname in roms:
+                        continue
+
+                    if iextension == '*.cue':
+                        to_skip.update(self._get_cached_cue_bins(ifile_pathname))
+                    elif iextension == '*.ccd':
+                        to_skip.add(raw_name + '.img')
+
+                    if ifile_name in to_skip:
+                        continue
+
+                    roms[ifile_pathname] = clean_name
+
+            roms_list.append(roms)
+
+        return roms_list
+
+
+    def _fixup_game_titles(self, roms:dict) -> dict:
+        for pathname in roms.copy():
             name = roms[pathname]
             parts = name.split()
 
-            if len(parts) >= 2 and parts[1] == 'The' and parts[0][-1] == ',':
-                if len(parts[0]) > 1 and parts[-2] != ',':
-                    part0 = parts[0][:-1]
-                    part1 = parts[1]
+            if len(parts) >= 2 and parts[1] == 'The' and parts[0][-1] == ',':
+                if len(parts[0]) > 1 and parts[-2] != ',':
+                    part0 = parts[0][:-1]
+                    part1 = parts[1]
+
+                    parts[0] = part1
+                    parts[1] = part0
+
+                    roms[pathname] = ' '.join(parts)
+
+        return roms
+
+
+    def _fixup_game_titles2(self, roms:dict) -> dict:
+        for pathname in roms.copy():
+            name = roms[pathname]
+
+            if name.count(' ') > 0 or not name.count('_'):
+                continue
+
+            parts = name.split('_', 1)
+
+            if len(parts) >= 1:
+                roms[pathname] = parts[0]
+
+        return roms
+
+
+    def _fixup_game_titles3(self, roms:dict) -> dict:
+        for pathname in roms.copy():
+            name = roms[pathname]
+
+            if name.count(' ') > 0:
+                continue
+
+            if name.islower() or name.isupper():
+                continue
+
+            parts = [p.strip() for p in Emulator.re_fixup_game_title_3.split(name) if p.strip() != '']
+            name = ' '.join(parts)
+
+            roms[pathname] = ' '.join(parts)
+
+        return roms
+
+
+    def _fixup_all_game_titles(self, roms:dict) -> dict:
+        # every title is fixed up only once, so a rescan
+        # fixes up only titles of new roms
+        new_titles = {ititle: ititle for ititle in roms.values() if ititle not in self._fixed_game_titles}
+
+        if self.fix_game_title:
+            new_titles = self._fixup_game_titles(new_titles)
+
+        if self.fix_game_title2:
+            new_titles = self._fixup_game_titles2(new_titles)
+
+        if self.fix_game_title3:
+            new_titles = self._fixup_game_titles3(new_titles)
+
+        self._fixed_game_titles.update(new_titles)
+
+        return {ipathname: self._fixed_game_titles[ititle] for ipathname, ititle in roms.items()}
+
+
+    def _count_rom_titles(self, roms:dict) -> dict:
+        # append (2) (3) (4) etc. to duplicated names
+        names_count = {}
+        names_positions = {}
+        pathnames = list(roms.keys())
+
+        for iposition, iname in enumerate(roms.values()):
+            names_count[iname] = names_count.get(iname, 0) + 1
+            names_positions.setdefault(iname, []).append(iposition)
+
+        for pathname in pathnames:
+            name = roms[pathname]
+
+            if names_count.get(name, 0) <= 1:
+                continue
+
+            # positions of roms named like that at the moment,
+            # numbered names can clash with existing ones
+            name_positions = names_positions[name]
+
+            for counter, iposition in enumerate(name_positions[1:], 2):
+                counted_name = name + ' (' + str(counter) + ')'
+
+                roms[pathnames[iposition]] = counted_name
+                bisect.insort(names_positions.setdefault(counted_name, []), iposition)
+
+            names_positions[name] = name_positions[:1]
+
+        return roms
+
+
+    def _sort_roms_by_name(self, roms:dict) -> dict:
+        return {k: v for k, v in sorted(roms.items(), key=lambda item: item[1])}
+
+
+    def _add_new_roms(self, roms:dict, new_roms:dict, roms_titles:set):
+        # skip roms already found by previous run patterns, roms with
+        # the same title from the same run pattern are all added
+        # and numbered later by _count_rom_titles
+        for ipathname, iname in new_roms.items():
+            if iname not in roms_titles:
+                roms[ipathname] = iname
+
+        roms_titles.update(new_roms.values())
+
+
+    def _get_roms_index_fingerprint(self) -> str:
+        # everything that changes the result of the scan, except the files
+        return json.dumps([
+            ROMS_INDEX_VERSION,
+            self.get_full_roms_path(),
+            self.run_patterns_roms_extensions,
+            self.rom_name_remove,
+            self.rom_basename_ignore,
+            self.fix_game_title,
+            self.fix_game_title2,
+            self.fix_game_title3,
+            self._get_roms_config_mtime()
+        ])
+
+
+    def _load_roms_index(self) -> Optional[dict]:
+        if not self.roms_index:
+            return None
+
+        index_data = self.roms_index.load(self.internal_name)
+
+        if not index_data or index_data['fingerprint'] != self._get_roms_index_fingerprint():
+            return None
+
+        return index_data
+
+
+    def _save_roms_index(self, roms:dict):
+        if not self.roms_index or not self._roms_directories:
+            return
+
+        self.roms_index.save(self.internal_name, {
+            'fingerprint': self._get_roms_index_fingerprint(),
+            'directories': self._roms_directories,
+            'roms': list(roms.items())
+        })
+
+
+    def get_emulator_roms(self, cached:bool = True) -> Optional[dict]:
+        # called from GUI and scanning threads
+        with self._roms_lock:
+            return self._get_emulator_roms_unlocked(cached)
+
+
+    def get_emulator_roms_list(self, cached:bool = True, roms_found = None) -> RomsList:
+        with self._roms_lock:
+            self._get_emulator_roms_unlocked(cached, roms_found)
+
+            return self._cached_roms_list
+
+
+    def get_cached_roms(self) -> Optional[dict]:
+        # None when roms are not scanned yet
+        return self._cached_roms
+
+
+    def _set_cached_roms(self, roms:dict):
+        self._cached_roms = roms
+        self._cached_roms_list = RomsList(roms)
+
+
+    def _get_emulator_roms_unlocked(self, cached:bool, roms_found = None) -> Optional[dict]:
+        if cached and self._cached_roms is not None:
+            return self._cached_roms
+
+        start_time = time.perf_counter()
+
+        self._load_roms_config()
+
+        if not self._roms_directories:
+            index_data = self._load_roms_index()
+
+            if index_data:
+                if cached and not self._is_roms_directories_changed(index_data['directories']):
+                    self._roms_directories = index_data['directories']
+                    self._set_cached_roms(dict(index_data['roms']))
+
+                    print('{system_name}: {count} roms loaded from index in {time:.3f}s'.format(
+                        system_name=self.system_name,
+                        count=len(self._cached_roms),
+                        time=time.perf_counter() - start_time
+                    ))
+
+                    return self._cached_roms
+
+                self._roms_directories = index_data['directories']
+
+        roms = {}
+        roms_titles = set()
+
+        # only directories changed since previous scan are listed again
+        for new_roms in self._get_emulator_roms(self._roms_directories, roms_found) or []:
+            if new_roms:
+                self._add_new_roms(roms, new_roms, roms_titles)
+
+        roms = self._fixup_all_game_titles(roms)
+        roms = self._count_rom_titles(roms)
+        roms = self._sort_roms_by_name(roms)
+
+        self._save_roms_index(roms)
+
+        print('{system_name}: {count} roms scanned in {time:.3f}s'.format(
+            system_name=self.system_name,
+            count=len(roms),
+            time=time.perf_counter() - start_time
+        ))
+
+        self._set_cached_roms(roms)
+        return self._cached_roms
+
+
+    def _find_rom_run_pattern(self, rom_path:str) -> Optional[str]:
+        rom_path_basename = os.path.basename(rom_path.lower())
+
+        for irun_pattern_roms_extensions in self.run_patterns_roms_extensions:
+            for iextension in irun_pattern_roms_extensions:
+                if fnmatch.fnmatch(rom_path_basename, iextension):
+                    run_pattern_index = self.run_patterns_roms_extensions.index(irun_pattern_roms_extensions)
+
+                    return self.run_patterns[run_pattern_index]
+
+        return None
+
+
+    def _find_rom_run_pattern_index(self, rom_path:str) -> Optional[int]:
+        rom_path_basename = os.path.basename(rom_path.lower())
+
+        for irun_pattern_roms_extensions in self.run_patterns_roms_extensions:
+            for iextension in irun_pattern_roms_extensions:
+                if fnmatch.fnmatch(rom_path_basename, iextension):
+                    run_pattern_index = self.run_patterns_roms_extensions.index(irun_pattern_roms_extensions)
+
+                    return run_pattern_index
+
+        return None
+
+
+    def _find_similar_roms(self, rom_path:str) -> List[str]:
+        dirname = os.path.dirname(rom_path)
+        basename = os.path.basename(rom_path)
+
+        (filename, extension) = os.path.splitext(basename)
+
+        match = Emulator.re_similar_rom_sign.findall(basename)
+        len_match = len(match)
+
+        if len_match != 1:
+            return [rom_path]
+
+        (no_disc_filename, count) = Emulator.re_similar_rom_sign.subn('', basename, 1)
+        (clean_filename, extension) = os.path.splitext(no_disc_filename)
+
+        files = glob.glob(os.path.join(dirname, '*' + extension))
+        similar = []
+
+        for ifile in files:
+            ifile_basename = os.path.basename(ifile)
+
+            if ifile_basename.startswith(clean_filename) and len(Emulator.re_similar_rom_sign.findall(ifile_basename)) == 1 and ifile_basename.endswith(extension):
+                if ifile not in similar:
+                    similar.append(ifile)
+
+        return sorted(similar)
+
+
+    def _process_extended_pattern(self, pattern:str, rom_path:str, run_pattern_data:dict) -> str:
+        if '{unpacked_rom_path-first_directory}' in pattern and 'unpacked_rom_path' in run_pattern_data:
+            run_pattern_data['unpacked_rom_path-first_directory'] = Utils.find_first_directory(run_pattern_data['unpacked_rom_path'])
+
+            return pattern
+
+        if '{{iterate_roms:' not in pattern:
+            return pattern
+
+        pattern_parts = json.loads(pattern)
+        similar_roms = self._find_similar_roms(rom_path)
+        result_list = []
+
+        for index, ipattern_part in enumerate(pattern_parts):
+            if not ipattern_part or not ipattern_part.endswith('}}'):
+                result_list.append(ipattern_part)
+                continue
+
+            command_parts = ipattern_part[2:-2].split(':', 3)
+
+            if len(command_parts) != 3:
+                result_list.append(ipattern_part)
+                continue
+
+            similar_roms_copy = similar_roms.copy()
+
+            if command_parts[0] == 'iterate_roms':
+                command_data_unfilled = command_parts[1]
+                command_max = int(command_parts[2])
+
+                if command_max < 1:
+                    result_list.append(ipattern_part)
+                    continue
+
+                # first rom is always at 0 index
+                if len(similar_roms_copy) > command_max:
+                    similar_roms_copy = similar_roms_copy[0:command_max]
+
+                result_list.append(command_data_unfilled.format(rom_index=0, rom_path=rom_path))
+
+                # avoid error when similar_roms_copy is empty (command_max=1)
+                if rom_path in similar_roms_copy:
+                    similar_roms_copy.remove(rom_path)
+
+                for irom_path_index, irom_path in enumerate(similar_roms_copy):
+                    result_list.append(command_data_unfilled.format(rom_index=irom_path_index + 1, rom_path=irom_path))
+            elif command_parts[0] == 'iterate_all_roms':
+                command_data_unfilled = command_parts[1]
+                command_max = int(command_parts[2])
+
+                if command_max < 1:
+                    result_list.append(ipattern_part)
+                    continue
+
+                # first rom is always at 0 index
+                if len(similar_roms_copy) > command_max:
+                    similar_roms_copy = similar_roms_copy[0:command_max]
+
+                for irom_path_index, irom_path in enumerate(similar_roms_copy):
+                    result_list.append(command_data_unfilled.format(rom_index=irom_path_index, rom_path=irom_path))
+
+        return json.dumps(result_list)
+
+
+    def _run_pre_commands(self, pre_commands:list, run_pattern_data:dict, progress:LaunchProgress):
+        if not self.run_patterns_pre_commands:
+            return
+
+        for icmd in pre_commands:
+            if icmd.startswith('copy '):
+                icmd_parts = icmd.split(' ', 3)
+
+                if len(icmd_parts) < 3:
+                    continue
+
+                target_is_directory = icmd_parts[2].endswith('\\') or icmd_parts[2].endswith('/')
 
-                    parts[0] = part1
-                    parts[1] = part0
+                icmd_parts[1] = Utils.adjust_to_system_path(icmd_parts[1].format(**run_pattern_data))
+                icmd_parts[2] = Utils.adjust_to_system_path(icmd_parts[2].format(**run_pattern_data))
 
-                    roms[pathname] = ' '.join(parts)
+                progress.start_stage('Copying ' + os.path.basename(icmd_parts[1]))
+                Utils.copy_files(glob.glob(icmd_parts[1]), icmd_parts[2], target_is_directory)
+            elif icmd.startswith('unpack '):
+                icmd_parts = icmd.split(' ', 2)
 
-        return roms
+                if len(icmd_parts) < 2:
+                    continue
 
+                icmd_parts[1] = Utils.adjust_to_system_path(icmd_parts[1].format(**run_pattern_data))
 
-    def _fixup_game_titles2(self, roms:dict) -> dict:
-        for pathname in roms.copy():
-            name = roms[pathname]
+                progress.start_stage('Unpacking ' + os.path.basename(icmd_parts[1]))
 
-            if name.count(' ') > 0 or not name.count('_'):
-                continue
+                if self.unpack_to_tmp:
+                    # unpack_cache is always set with unpack_to_tmp
+                    run_pattern_data['unpacked_rom_path'] = self.unpack_cache.unpack(self.internal_name, icmd_parts[1], self.unpack_native, True)
+                    continue
 
-            parts = name.split('_', 1)
+                (rom_filename, ext) = os.path.splitext(os.path.basename(icmd_parts[1]))
+                unpacked_rom_path = os.path.join(run_pattern_data['roms_path'], rom_filename)
 
-            if len(parts) >= 1:
-                roms[pathname] = parts[0]
+                run_pattern_data['unpacked_rom_path'] = unpacked_rom_path
 
-        return roms
+                if os.path.exists(unpacked_rom_path) and len(os.listdir(unpacked_rom_path)) > 0:
+                    # directory exists and is not empty
+                    continue
 
+                os.makedirs(unpacked_rom_path, exist_ok=True)
 
-    def _fixup_game_titles3(self, roms:dict) -> dict:
-        for pathname in roms.copy():
-            name = roms[pathname]
+                Utils.extract_archive(icmd_parts[1], unpacked_rom_path, self.unpack_native)
+            elif icmd.startswith('delete '):
+                icmd_parts = icmd.split(' ', 2)
 
-            if name.count(' ') > 0:
+                if len(icmd_parts) < 2:
+                    continue
+
+                icmd_parts[1] = Utils.adjust_to_system_path(icmd_parts[1].format(**run_pattern_data))
+
+                progress.start_stage('Deleting ' + os.path.basename(icmd_parts[1]))
+
+                if os.path.exists(icmd_parts[1]):
+                    os.remove(icmd_parts[1])
+            elif icmd.startswith('write '):
+                icmd_parts = icmd.split(' ', 2)
+
+                if len(icmd_parts) < 2:
+                    continue
+
+                icmd_parts[1] = Utils.adjust_to_system_path(icmd_parts[1].format(**run_pattern_data))
+                icmd_parts[2] = icmd_parts[2].format(**run_pattern_data)
+
+                progress.start_stage('Writing ' + os.path.basename(icmd_parts[1]))
+                os.makedirs(os.path.dirname(icmd_parts[1]), exist_ok=True)
+
+                with open(icmd_parts[1], 'a+', newline='') as f:
+                    print(icmd_parts[2], sep='\r', file=f)
+            elif icmd.startswith('write_basename '):
+                icmd_parts = icmd.split(' ', 3)
+
+                if len(icmd_parts) < 3:
+                    continue
+
+                icmd_parts[1] = Utils.adjust_to_system_path(icmd_parts[1].format(**run_pattern_data))
+                icmd_parts[2] = Utils.adjust_to_system_path(icmd_parts[2].format(**run_pattern_data))
+
+                progress.start_stage('Writing ' + os.path.basename(icmd_parts[2]))
+                run_pattern_data['write_basename'] = Utils.find_file(
+                    os.path.dirname(icmd_parts[1]),
+                    os.path.basename(icmd_parts[1]),
+                    True,
+                    False,
+                    True
+                )
+
+                icmd_parts[3] = icmd_parts[3].format(**run_pattern_data)
+
+                with open(icmd_parts[2], 'a+', newline='') as f:
+                    print(icmd_parts[3], sep='\r', file=f)
+
+
+    def _get_run_pattern_data(self, exe_path:str, rom_path:str) -> dict:
+        run_pattern_data = {
+            'exe_path': exe_path,
+            'rom_path': rom_path,
+            'roms_path': self.get_full_roms_path(),
+            'bios_path': self.bios_path
+        }
+
+        if self.custom_data:
+            run_pattern_data.update(self.custom_data)
+
+        return run_pattern_data
+
+
+    def _get_rom_unpack_pre_commands(self, rom_path:str) -> list:
+        if not self.run_patterns_pre_commands:
+            return []
+
+        run_pattern_index = self._find_rom_run_pattern_index(rom_path)
+
+        if run_pattern_index is None or run_pattern_index >= len(self.run_patterns_pre_commands):
+            return []
+
+        return [icmd for icmd in self.run_patterns_pre_commands[run_pattern_index] if icmd.startswith('unpack ')]
+
+
+    def can_warm_roms(self) -> bool:
+        if not self.unpack_to_tmp or not self.unpack_cache or not self.run_patterns_pre_commands:
+            return False
+
+        for ipre_commands in self.run_patterns_pre_commands:
+            for icmd in ipre_commands:
+                if icmd.startswith('unpack '):
+                    return True
+
+        return False
+
+
+    def warm_rom(self, rom_path:str) -> bool:
+        # unpacks archive rom into unpack cache, so run_rom
+        # does not have to, returns True if it was unpacked
+        if not self.can_warm_roms():
+            return False
+
+        exe_path = self.get_emulator_executable()
+
+        if not exe_path:
+            return False
+
+        run_pattern_data = self._get_run_pattern_data(exe_path, rom_path)
+        warmed = False
+
+        for icmd in self._get_rom_unpack_pre_commands(rom_path):
+            icmd_parts = icmd.split(' ', 2)
+
+            if len(icmd_parts) < 2:
                 continue
 
-            if name.islower() or name.isupper():
+            archive_pathname = Utils.adjust_to_system_path(icmd_parts[1].format(**run_pattern_data))
+
+            if not os.path.isfile(archive_pathname):
                 continue
 
-            parts = [p.strip() for p in Emulator.re_fixup_game_title_3.split(name) if p.strip() != '']
-            name = ' '.join(parts)
+            if self.unpack_cache.is_unpacked(self.unpack_cache.get_entry_pathname(self.internal_name, archive_pathname)):
+                continue
 
-            roms[pathname] = ' '.join(parts)
+            self.unpack_cache.unpack(self.internal_name, archive_pathname, self.unpack_native)
+            warmed = True
 
-        return roms
+        return warmed
 
 
-    def _count_rom_titles(self, roms:dict) -> dict:
-        # append (2) (3) (4) etc. to duplicated names
-        roms_values = list(roms.values())
+    def run_rom(self, rom_path: str, progress:Optional[LaunchProgress] = None) -> subprocess:
+        if progress is None:
+            progress = LaunchProgress()
 
-        for pathname in roms.copy():
-            name = roms[pathname]
-            ientry_count = roms_values.count(name)
+        exe_path = self.get_emulator_executable()
 
-            if ientry_count > 1:
-                counter = 1
+        if not exe_path:
+            self._raise_no_exe_exception()
 
-                for ientry2 in roms:
-                    if roms[ientry2] == name:
-                        if counter > 1:
-                            roms[ientry2] = name + ' (' + str(counter) + ')'
+        run_pattern_index = self._find_rom_run_pattern_index(rom_path)
 
-                        counter += 1
+        if run_pattern_index is None:
+            # should not get here
+            self._raise_no_rom_run_pattern_exception(rom_path)
 
-        return roms
+        run_pattern = self.run_patterns[run_pattern_index]
+        run_pattern_data = self._get_run_pattern_data(exe_path, rom_path)
 
+        if self.run_patterns_pre_commands and run_pattern_index < len(self.run_patterns_pre_commands):
+            self._run_pre_commands(self.run_patterns_pre_commands[run_pattern_index], run_pattern_data, progress)
 
-    def _sort_roms_by_name(self, roms:dict) -> dict:
-        return {k: v for k, v in sorted(roms.items(), key=lambda item: item[1])}
+        rom_config = self._find_rom_config(rom_path)
 
+        if rom_config:
+            run_pattern_data.update(rom_config)
 
-    def _add_new_roms(self, roms:dict, new_roms:dict):
-        roms_values = list(roms.values())
+        run_pattern = self._process_extended_pattern(run_pattern, rom_path, run_pattern_data)
+        run_pattern_data = Utils.adjust_dict_all_to_system_path(run_pattern_data)
+        run_command_list = json.loads(run_pattern)
 
-        for ipathname, iname in new_roms.items():
-            if iname not in roms_values:
-                roms[ipathname] = iname
+        for ipattern_index, ipattern_item in enumerate(run_command_list.copy()):
+            run_command_list[ipattern_index] = ipattern_item.format(**run_pattern_data)
 
+        run_command_str = ' '.join(run_command_list)
 
-    def get_emulator_roms(self, cached:bool = True) -> Optional[dict]:
-        if cached and self._cached_roms is not None:
-            return self._cached_roms
+        progress.start_stage('Starting ' + self.emulator_name)
+        print('Running command: ' + run_command_str)
 
-        self._roms_config = self._parse_roms_config()
+        self._running_rom = subprocess.Popen(run_command_list, cwd=os.path.dirname(exe_path))
+        progress.finish()
 
-        roms = {}
+        return self._running_rom
 
-        for iroms_extensions in self.run_patterns_roms_extensions:
-            new_roms = self._get_emulator_roms(iroms_extensions)
 
-            if new_roms:
-                self._add_new_roms(roms, new_roms)
+    def run_gui(self) -> subprocess:
+        exe_path = self.get_gui_executable()
+
+        if not exe_path:
+            self._raise_no_exe_exception()
+
+        self._running_rom = subprocess.Popen([exe_path], cwd=os.path.dirname(exe_path))
+
+        return self._running_rom
+
+
+@typechecked_class_decorator()
+class CoversCache:
+    def __init__(self, max_size:int):
+        # least recently used pixmaps are dropped first
+        # when size of all pixmaps exceeds max_size bytes
+        self.max_size = max_size
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.dropped_size = 0
+        self._pixmaps = collections.OrderedDict()
+
+
+    def _get_pixmap_size(self, pixmap:QtGui.QPixmap) -> int:
+        return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+
+
+    def get(self, key:tuple) -> Optional[QtGui.QPixmap]:
+        pixmap = self._pixmaps.get(key)
+
+        if pixmap is None:
+            self.misses += 1
+            return None
+
+        self._pixmaps.move_to_end(key)
+        self.hits += 1
+
+        return pixmap
+
+
+    def put(self, key:tuple, pixmap:QtGui.QPixmap):
+        pixmap_size = self._get_pixmap_size(pixmap)
+
+        if pixmap_size > self.max_size:
+            return
+
+        if key in self._pixmaps:
+            self.size -= self._get_pixmap_size(self._pixmaps.pop(key))
+
+        self._pixmaps[key] = pixmap
+        self.size += pixmap_size
+
+        while self.size > self.max_size:
+            _, old_pixmap = self._pixmaps.popitem(last=False)
+            self.size -= self._get_pixmap_size(old_pixmap)
+
+
+    def keys(self) -> list:
+        return list(self._pixmaps.keys())
+
+
+    def clear(self):
+        self._pixmaps.clear()
+        self.dropped_size += self.size
+        self.size = 0
+
+
+    def get_stats(self) -> dict:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'count': len(self._pixmaps),
+            'size': self.size,
+            'dropped_size': self.dropped_size
+        }
+
+
+@typechecked_class_decorator()
+class CoversIndex:
+    def __init__(self, covers_base_path:str):
+        self.covers_base_path = covers_base_path
+        self._directories_files = {}
+
+
+    def _get_directory_mtime(self, directory_pathname:str) -> Optional[int]:
+        try:
+            return os.stat(directory_pathname).st_mtime_ns
+        except OSError:
+            return None
+
+
+    def _get_directory_files(self, directory_pathname:str) -> set:
+        # each covers directory is listed again only when its mtime
+        # changes (a cover is added or removed) or clear() is called,
+        # so new covers are found without watching directories
+        directory_mtime = self._get_directory_mtime(directory_pathname)
+        directory_files = self._directories_files.get(directory_pathname)
+
+        if directory_files is not None and directory_files[0] == directory_mtime:
+            return directory_files[1]
+
+        files = set()
+
+        try:
+            with os.scandir(directory_pathname) as entries:
+                for ientry in entries:
+                    if ientry.is_file():
+                        files.add(os.path.normcase(ientry.name))
+        except OSError:
+            pass
+
+        self._directories_files[directory_pathname] = (directory_mtime, files)
+
+        return files
+
+
+    def find_rom_cover(self, raw_roms_path:str, rom_path:str) -> Optional[str]:
+        rom_basename = os.path.basename(rom_path)
+
+        # covers in covers_base_path first, then in the system directory
+        for idirectory_pathname in [self.covers_base_path, os.path.join(self.covers_base_path, raw_roms_path)]:
+            files = self._get_directory_files(idirectory_pathname)
+
+            for iextension in COVERS_EXTENSIONS:
+                if os.path.normcase(rom_basename + iextension) in files:
+                    return os.path.join(idirectory_pathname, rom_basename + iextension)
+
+        return None
+
+
+    def clear(self):
+        self._directories_files = {}
+
+
+@typechecked_class_decorator()
+class CoversThumbnails:
+    def __init__(self, thumbnails_path:Optional[str], max_size:int = 0):
+        # without thumbnails_path covers are scaled down
+        # in memory only, nothing is saved
+        self.thumbnails_path = thumbnails_path
+        self.max_size = max_size
+        self._saving_failed = False
+
+
+    def _get_bucket_size(self, size:QtCore.QSize) -> QtCore.QSize:
+        # label size is rounded up, so small changes of
+        # the window size use the same thumbnails
+        return QtCore.QSize(
+            (size.width() // COVERS_THUMBNAILS_BUCKET_SIZE + 1) * COVERS_THUMBNAILS_BUCKET_SIZE,
+            (size.height() // COVERS_THUMBNAILS_BUCKET_SIZE + 1) * COVERS_THUMBNAILS_BUCKET_SIZE
+        )
+
+
+    def _get_cover_hash(self, cover_file_pathname:str) -> str:
+        return hashlib.sha1(os.path.normcase(os.path.abspath(cover_file_pathname)).encode('utf-8', 'surrogateescape')).hexdigest()
+
+
+    def _get_thumbnail_prefix(self, cover_hash:str, cover_mtime:int) -> str:
+        return '{hash}_{mtime}_'.format(hash=cover_hash, mtime=cover_mtime)
+
+
+    def load_cover(self, cover_file_pathname:str, size:QtCore.QSize) -> QtGui.QImage:
+        # QImage, not QPixmap, so it can be called from other threads too
+        if size.isEmpty():
+            return QtGui.QImage(cover_file_pathname)
+
+        bucket_size = self._get_bucket_size(size)
+        thumbnail_pathname = None
+
+        if self.thumbnails_path:
+            cover_hash = self._get_cover_hash(cover_file_pathname)
+            cover_mtime = os.stat(cover_file_pathname).st_mtime_ns
+            cover_extension = os.path.splitext(cover_file_pathname)[1].lower()
+
+            thumbnail_pathname = os.path.join(self.thumbnails_path, '{prefix}{width}x{height}{extension}'.format(
+                prefix=self._get_thumbnail_prefix(cover_hash, cover_mtime),
+                width=bucket_size.width(),
+                height=bucket_size.height(),
+                extension=cover_extension
+            ))
+
+            if os.path.exists(thumbnail_pathname):
+                image = QtGui.QImage(thumbnail_pathname)
+
+                if not image.isNull():
+                    self._touch_thumbnail(thumbnail_pathname)
+                    return image
+
+        image = QtGui.QImage(cover_file_pathname)
+
+        # thumbnail covers the whole bucket, so it can be scaled down
+        # to any size in it, smaller covers are used as they are
+        thumbnail_size = image.size().scaled(bucket_size, Qt.KeepAspectRatioByExpanding)
+
+        if image.isNull() or thumbnail_size.width() >= image.width():
+            return image
+
+        image = image.scaled(thumbnail_size, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+
+        if thumbnail_pathname:
+            self._save_thumbnail(image, thumbnail_pathname, cover_hash, cover_mtime)
+
+        return image
+
+
+    def load_scaled_cover(self, cover_file_pathname:str, cover_label_size:QtCore.QSize, cover_size:Optional[tuple] = None) -> QtGui.QImage:
+        # cover as it is shown, scaled to cover_size or without it
+        # bigger covers are scaled down to fit the label with
+        # the same aspect ratio
+        image = self.load_cover(cover_file_pathname, cover_label_size)
+
+        if image.isNull():
+            return image
+
+        if cover_size:
+            return self._scale_image(image, QtCore.QSize(cover_size[0], cover_size[1]))
+
+        if image.width() > cover_label_size.width() or image.height() > cover_label_size.height():
+            image = self._scale_image(image, cover_label_size, QtCore.Qt.KeepAspectRatio)
+
+        return image
+
+
+    def _scale_image(self, image:QtGui.QImage, size:QtCore.QSize, aspect_ratio_mode:QtCore.Qt.AspectRatioMode = QtCore.Qt.IgnoreAspectRatio) -> QtGui.QImage:
+        fast_size = size * COVER_FAST_SCALE_FACTOR
+
+        # much bigger covers are cheaply scaled down first,
+        # smooth scaling is done on the smaller one only
+        if image.width() > fast_size.width() and image.height() > fast_size.height():
+            image = image.scaled(fast_size, aspect_ratio_mode, QtCore.Qt.FastTransformation)
+
+        return image.scaled(size, aspect_ratio_mode, QtCore.Qt.SmoothTransformation)
+
+
+    def _touch_thumbnail(self, thumbnail_pathname:str):
+        # mtime of a thumbnail is the time it was last used
+        if self._saving_failed:
+            return
+
+        try:
+            os.utime(thumbnail_pathname)
+        except OSError:
+            pass
 
-        if self.fix_game_title:
-            roms = self._fixup_game_titles(roms)
 
-        if self.fix_game_title2:
-            roms = self._fixup_game_titles2(roms)
+    def _save_thumbnail(self, image:QtGui.QImage, thumbnail_pathname:str, cover_hash:str, cover_mtime:int):
+        # once it failed (eg. read-only covers directory)
+        # it would fail for every cover
+        if self._saving_failed:
+            return
 
-        if self.fix_game_title3:
-            roms = self._fixup_game_titles3(roms)
+        thumbnail_format = 'PNG' if thumbnail_pathname.endswith('.png') else 'JPG'
+        tmp_pathname = '{pathname}.{thread}.tmp'.format(pathname=thumbnail_pathname, thread=threading.get_ident())
 
-        roms = self._count_rom_titles(roms)
-        roms = self._sort_roms_by_name(roms)
+        try:
+            os.makedirs(self.thumbnails_path, exist_ok=True)
+
+            # thumbnails of older versions of the cover
+            for ipathname in glob.glob(os.path.join(glob.escape(self.thumbnails_path), cover_hash + '_*')):
+                if not os.path.basename(ipathname).startswith(self._get_thumbnail_prefix(cover_hash, cover_mtime)):
+                    try:
+                        os.remove(ipathname)
+                    except FileNotFoundError:
+                        # removed by other thread
+                        pass
+
+            if not image.save(tmp_pathname, thumbnail_format):
+                self._saving_failed = True
+                print('Cannot save cover thumbnail ' + thumbnail_pathname + ', thumbnails will not be saved')
+                return
 
-        self._cached_roms = roms
-        return self._cached_roms
+            os.replace(tmp_pathname, thumbnail_pathname)
+        except OSError as x:
+            self._saving_failed = True
+            print('Cannot save cover thumbnail ' + thumbnail_pathname + ': ' + str(x) + ', thumbnails will not be saved')
 
 
-    def _find_rom_run_pattern(self, rom_path:str) -> Optional[str]:
-        rom_path_basename = os.path.basename(rom_path.lower())
+    def clean(self, covers_directories:list):
+        # removes thumbnails of removed or changed covers, then least
+        # recently used ones until all of them fit in max_size
+        if not self.thumbnails_path or not os.path.isdir(self.thumbnails_path):
+            return
 
-        for irun_pattern_roms_extensions in self.run_patterns_roms_extensions:
-            for iextension in irun_pattern_roms_extensions:
-                if fnmatch.fnmatch(rom_path_basename, iextension):
-                    run_pattern_index = self.run_patterns_roms_extensions.index(irun_pattern_roms_extensions)
+        start_time = time.perf_counter()
+        covers_prefixes = set()
 
-                    return self.run_patterns[run_pattern_index]
+        for idirectory_pathname in covers_directories:
+            try:
+                with os.scandir(idirectory_pathname) as entries:
+                    for ientry in entries:
+                        if ientry.is_file() and os.path.splitext(ientry.name)[1].lower() in COVERS_EXTENSIONS:
+                            covers_prefixes.add(self._get_thumbnail_prefix(
+                                self._get_cover_hash(ientry.path),
+                                ientry.stat().st_mtime_ns
+                            ))
+            except OSError:
+                pass
+
+        thumbnails = []
+        removed_count = 0
+
+        with os.scandir(self.thumbnails_path) as entries:
+            for ientry in entries:
+                # saved by other thread at the moment
+                if not ientry.is_file() or ientry.name.endswith('.tmp'):
+                    continue
 
-        return None
+                iprefix = ientry.name[:ientry.name.rfind('_') + 1]
 
+                try:
+                    if iprefix not in covers_prefixes:
+                        os.remove(ientry.path)
+                        removed_count += 1
+                        continue
 
-    def _find_rom_run_pattern_index(self, rom_path:str) -> Optional[int]:
-        rom_path_basename = os.path.basename(rom_path.lower())
+                    istat = ientry.stat()
+                    thumbnails.append((istat.st_mtime_ns, istat.st_size, ientry.path))
+                except OSError:
+                    pass
 
-        for irun_pattern_roms_extensions in self.run_patterns_roms_extensions:
-            for iextension in irun_pattern_roms_extensions:
-                if fnmatch.fnmatch(rom_path_basename, iextension):
-                    run_pattern_index = self.run_patterns_roms_extensions.index(irun_pattern_roms_extensions)
+        thumbnails_size = sum(isize for _, isize, _ in thumbnails)
 
-                    return run_pattern_index
+        for _, isize, ipathname in sorted(thumbnails):
+            if thumbnails_size <= self.max_size:
+                break
 
-        return None
+            try:
+                os.remove(ipathname)
+            except OSError:
+                continue
 
+            thumbnails_size -= isize
+            removed_count += 1
 
-    def _find_similar_roms(self, rom_path:str) -> List[str]:
-        dirname = os.path.dirname(rom_path)
-        basename = os.path.basename(rom_path)
+        if removed_count:
+            print('Removed {count} covers thumbnails in {time:.3f}s, {size} bytes left'.format(
+                count=removed_count,
+                time=time.perf_counter() - start_time,
+                size=thumbnails_size
+            ))
 
-        (filename, extension) = os.path.splitext(basename)
 
-        match = Emulator.re_similar_rom_sign.findall(basename)
-        len_match = len(match)
+@typechecked_class_decorator(exclude=['roms_found', 'scan_finished', 'scan_failed', 'emulator_scanned'])
+class RomsScanSignals(QObject):
+    roms_found = Signal(int, object)
+    scan_finished = Signal(int, object)
+    emulator_scanned = Signal(object)
+    scan_failed = Signal(int, object)
 
-        if len_match != 1:
-            return [rom_path]
 
-        (no_disc_filename, count) = Emulator.re_similar_rom_sign.subn('', basename, 1)
-        (clean_filename, extension) = os.path.splitext(no_disc_filename)
+@typechecked_class_decorator()
+class RomsScanTask(QRunnable):
+    def __init__(self, generation:int, emulator:Emulator, cached:bool):
+        super().__init__()
 
-        files = glob.glob(os.path.join(dirname, '*' + extension))
-        similar = []
+        self.generation = generation
+        self.emulator = emulator
+        self.cached = cached
+        self.signals = RomsScanSignals()
+        self._cancelled = False
 
-        for ifile in files:
-            ifile_basename = os.path.basename(ifile)
 
-            if ifile_basename.startswith(clean_filename) and len(Emulator.re_similar_rom_sign.findall(ifile_basename)) == 1 and ifile_basename.endswith(extension):
-                if ifile not in similar:
-                    similar.append(ifile)
+    def cancel(self):
+        # scan itself is not interrupted, its result is cached
+        # by the emulator, only sending of roms is dropped
+        self._cancelled = True
 
-        return sorted(similar)
 
+    def run(self):
+        try:
+            roms_list = self.emulator.get_emulator_roms_list(self.cached, self._roms_found)
+        except Exception as x:
+            self.signals.scan_failed.emit(self.generation, x)
+            return
 
-    def _process_extended_pattern(self, pattern:str, rom_path:str, run_pattern_data:dict) -> str:
-        if '{unpacked_rom_path-first_directory}' in pattern and 'unpacked_rom_path' in run_pattern_data:
-            run_pattern_data['unpacked_rom_path-first_directory'] = Utils.find_first_directory(run_pattern_data['unpacked_rom_path'])
+        self.signals.emulator_scanned.emit(self.emulator)
 
-            return pattern
+        if not self._cancelled:
+            self.signals.scan_finished.emit(self.generation, roms_list)
 
-        if '{{iterate_roms:' not in pattern:
-            return pattern
 
-        pattern_parts = json.loads(pattern)
-        similar_roms = self._find_similar_roms(rom_path)
-        result_list = []
+    def _roms_found(self, roms:dict):
+        # called by the emulator during the scan
+        if not self._cancelled:
+            self.signals.roms_found.emit(self.generation, RomsList(roms))
 
-        for index, ipattern_part in enumerate(pattern_parts):
-            if not ipattern_part or not ipattern_part.endswith('}}'):
-                result_list.append(ipattern_part)
-                continue
 
-            command_parts = ipattern_part[2:-2].split(':', 3)
+@typechecked_class_decorator(exclude=['cover_loaded'])
+class CoversPrefetchSignals(QObject):
+    cover_loaded = Signal(str, object, object)
 
-            if len(command_parts) != 3:
-                result_list.append(ipattern_part)
-                continue
 
-            similar_roms_copy = similar_roms.copy()
+@typechecked_class_decorator()
+class CoversPrefetchTask(QRunnable):
+    def __init__(
+            self,
+            roms_paths:list,
+            covers_index:CoversIndex,
+            emulator:Emulator,
+            cover_label_size:QtCore.QSize,
+            first_rom_cover_size:Optional[tuple],
+            covers_sizes:dict,
+            covers_thumbnails:CoversThumbnails,
+            loaded_covers:set):
+        super().__init__()
+
+        self.roms_paths = roms_paths
+        self.covers_index = covers_index
+        self.emulator = emulator
+        self.cover_label_size = cover_label_size
+        self.first_rom_cover_size = first_rom_cover_size
+        self.covers_sizes = covers_sizes
+        self.covers_thumbnails = covers_thumbnails
+        self.loaded_covers = loaded_covers
+        self.signals = CoversPrefetchSignals()
+        self._cancelled = False
+
+
+    def cancel(self):
+        self._cancelled = True
+
+
+    def run(self):
+        # covers are decoded and scaled to QImage here, QPixmap
+        # can be made in the GUI thread only
+        for irom_path in self.roms_paths:
+            if self._cancelled:
+                return
 
-            if command_parts[0] == 'iterate_roms':
-                command_data_unfilled = command_parts[1]
-                command_max = int(command_parts[2])
+            try:
+                cover_file_pathname = self.covers_index.find_rom_cover(self.emulator.raw_roms_path, irom_path)
 
-                if command_max < 1:
-                    result_list.append(ipattern_part)
+                if not cover_file_pathname or cover_file_pathname in self.loaded_covers:
                     continue
 
-                # first rom is always at 0 index
-                if len(similar_roms_copy) > command_max:
-                    similar_roms_copy = similar_roms_copy[0:command_max]
+                # the same key as MainWindow._get_cover_pixmap
+                key = (
+                    cover_file_pathname,
+                    self.cover_label_size.width(),
+                    self.cover_label_size.height(),
+                    os.stat(cover_file_pathname).st_mtime_ns,
+                    self.first_rom_cover_size
+                )
 
-                result_list.append(command_data_unfilled.format(rom_index=0, rom_path=rom_path))
+                image = self.covers_thumbnails.load_scaled_cover(
+                    cover_file_pathname,
+                    self.cover_label_size,
+                    self.first_rom_cover_size or self.covers_sizes.get(cover_file_pathname)
+                )
 
-                # avoid error when similar_roms_copy is empty (command_max=1)
-                if rom_path in similar_roms_copy:
-                    similar_roms_copy.remove(rom_path)
+                if not image.isNull() and not self._cancelled:
+                    self.signals.cover_loaded.emit(self.emulator.internal_name, key, image)
+            except Exception as x:
+                print('Cannot prefetch cover of ' + irom_path + ': ' + str(x))
 
-                for irom_path_index, irom_path in enumerate(similar_roms_copy):
-                    result_list.append(command_data_unfilled.format(rom_index=irom_path_index + 1, rom_path=irom_path))
-            elif command_parts[0] == 'iterate_all_roms':
-                command_data_unfilled = command_parts[1]
-                command_max = int(command_parts[2])
 
-                if command_max < 1:
-                    result_list.append(ipattern_part)
-                    continue
+@typechecked_class_decorator()
+class CoversThumbnailsCleanTask(QRunnable):
+    def __init__(self, covers_thumbnails:CoversThumbnails, covers_directories:list):
+        super().__init__()
 
-                # first rom is always at 0 index
-                if len(similar_roms_copy) > command_max:
-                    similar_roms_copy = similar_roms_copy[0:command_max]
+        self.covers_thumbnails = covers_thumbnails
+        self.covers_directories = covers_directories
 
-                for irom_path_index, irom_path in enumerate(similar_roms_copy):
-                    result_list.append(command_data_unfilled.format(rom_index=irom_path_index, rom_path=irom_path))
 
-        return json.dumps(result_list)
+    def run(self):
+        try:
+            self.covers_thumbnails.clean(self.covers_directories)
+        except Exception as x:
+            print('Cannot clean covers thumbnails: ' + str(x))
 
 
-    def _run_pre_commands(self, pre_commands:list, run_pattern_data:dict):
-        if not self.run_patterns_pre_commands:
-            return
+@typechecked_class_decorator(exclude=['stage_started', 'launch_finished', 'launch_failed'])
+class LaunchSignals(QObject):
+    stage_started = Signal(str)
+    launch_finished = Signal(object)
+    launch_failed = Signal(object)
 
-        for icmd in pre_commands:
-            if icmd.startswith('copy '):
-                icmd_parts = icmd.split(' ', 3)
 
-                if len(icmd_parts) < 3:
-                    continue
+@typechecked_class_decorator()
+class LaunchTask(QRunnable):
+    def __init__(self, emulator:Emulator, rom_path:str):
+        super().__init__()
 
-                target_is_directory = icmd_parts[2].endswith('\\') or icmd_parts[2].endswith('/')
+        self.emulator = emulator
+        self.rom_path = rom_path
+        self.signals = LaunchSignals()
+        self.progress = LaunchProgress(self.signals.stage_started.emit)
 
-                icmd_parts[1] = Utils.adjust_to_system_path(icmd_parts[1].format(**run_pattern_data))
-                icmd_parts[2] = Utils.adjust_to_system_path(icmd_parts[2].format(**run_pattern_data))
 
-                Utils.copy_files(glob.glob(icmd_parts[1]), icmd_parts[2], target_is_directory)
-            elif icmd.startswith('unpack '):
-                icmd_parts = icmd.split(' ', 2)
+    def cancel(self):
+        self.progress.cancel()
 
-                if len(icmd_parts) < 2:
-                    continue
 
-                icmd_parts[1] = Utils.adjust_to_system_path(icmd_parts[1].format(**run_pattern_data))
+    def run(self):
+        # pre-commands (copying, unpacking) can take
+        # a while, so they are not run in the GUI thread
+        try:
+            self.signals.launch_finished.emit(self.emulator.run_rom(self.rom_path, self.progress))
+        except LaunchCancelledException:
+            print('Launch of {rom_path} cancelled'.format(rom_path=self.rom_path))
+            self.signals.launch_finished.emit(None)
+        except Exception as x:
+            self.signals.launch_failed.emit(x)
 
-                (rom_filename, ext) = os.path.splitext(os.path.basename(icmd_parts[1]))
 
-                if self.unpack_to_tmp:
-                    unpacked_rom_path = os.path.join(tempfile.gettempdir(), self.internal_name, rom_filename)
-                else:
-                    unpacked_rom_path = os.path.join(run_pattern_data['roms_path'], rom_filename)
+@typechecked_class_decorator()
+class UnpackWarmTask(QRunnable):
+    def __init__(self, emulator:Emulator, roms_paths:list, is_batch:bool = False):
+        super().__init__()
 
-                run_pattern_data['unpacked_rom_path'] = unpacked_rom_path
+        self.emulator = emulator
+        self.roms_paths = roms_paths
+        self.is_batch = is_batch
+        self.finished = False
+        self._cancelled = False
 
-                if os.path.exists(unpacked_rom_path) and len(os.listdir(unpacked_rom_path)) > 0:
-                    # directory exists and is not empty
-                    continue
 
-                os.makedirs(unpacked_rom_path, exist_ok=True)
+    def cancel(self):
+        self._cancelled = True
 
-                try:
-                    patoolib.extract_archive(icmd_parts[1], outdir=unpacked_rom_path, interactive=False)
-                except Exception as x:
-                    x_str = str(x)
-
-                    if ' returned non-zero exit status ' in x_str:
-                        # omit error when archive cannot be unpacked
-                        # but log it to the standard output
-                        print(x_str)
-                    else:
-                        raise x
-            elif icmd.startswith('delete '):
-                icmd_parts = icmd.split(' ', 2)
 
-                if len(icmd_parts) < 2:
-                    continue
+    def run(self):
+        # idle priority does not slow down the GUI nor running
+        # emulator, on Linux it also puts the thread in idle I/O class
+        QThread.currentThread().setPriority(QThread.IdlePriority)
 
-                icmd_parts[1] = Utils.adjust_to_system_path(icmd_parts[1].format(**run_pattern_data))
+        try:
+            self._warm_roms()
+        finally:
+            self.finished = True
 
-                if os.path.exists(icmd_parts[1]):
-                    os.remove(icmd_parts[1])
-            elif icmd.startswith('write '):
-                icmd_parts = icmd.split(' ', 2)
 
-                if len(icmd_parts) < 2:
-                    continue
+    def _warm_roms(self):
+        for irom_path in self.roms_paths:
+            if self._cancelled:
+                return
 
-                icmd_parts[1] = Utils.adjust_to_system_path(icmd_parts[1].format(**run_pattern_data))
-                icmd_parts[2] = icmd_parts[2].format(**run_pattern_data)
+            if self.is_batch and self.emulator.unpack_cache.is_full():
+                # would remove roms unpacked a moment ago
+                print('Unpack cache is full, warming of {system_name} stopped'.format(system_name=self.emulator.system_name))
+                return
 
-                os.makedirs(os.path.dirname(icmd_parts[1]), exist_ok=True)
+            try:
+                self.emulator.warm_rom(irom_path)
+            except Exception as x:
+                print('Cannot warm ' + irom_path + ': ' + str(x))
 
-                with open(icmd_parts[1], 'a+', newline='') as f:
-                    print(icmd_parts[2], sep='\r', file=f)
-            elif icmd.startswith('write_basename '):
-                icmd_parts = icmd.split(' ', 3)
 
-                if len(icmd_parts) < 3:
-                    continue
+# rowCount() and data() are called by the view for every row on layout,
+# type checking them makes big lists slow
+@typechecked_class_decorator(exclude=['rowCount', 'data'])
+class RomsListModel(QAbstractListModel):
+    def __init__(self, parent=None):
+        super().__init__(parent)
 
-                icmd_parts[1] = Utils.adjust_to_system_path(icmd_parts[1].format(**run_pattern_data))
-                icmd_parts[2] = Utils.adjust_to_system_path(icmd_parts[2].format(**run_pattern_data))
+        # rows are read straight from the roms list by the view,
+        # only visible rows are ever asked for
+        self._roms_list = None
 
-                run_pattern_data['write_basename'] = Utils.find_file(
-                    os.path.dirname(icmd_parts[1]),
-                    os.path.basename(icmd_parts[1]),
-                    True,
-                    False,
-                    True
-                )
 
-                icmd_parts[3] = icmd_parts[3].format(**run_pattern_data)
+    def rowCount(self, parent:QModelIndex = QModelIndex()) -> int:
+        if parent.isValid() or self._roms_list is None:
+            return 0
 
-                with open(icmd_parts[2], 'a+', newline='') as f:
-                    print(icmd_parts[3], sep='\r', file=f)
+        return len(self._roms_list.pathnames)
 
 
-    def run_rom(self, rom_path: str) -> subprocess:
-        exe_path = self.get_emulator_executable()
+    def data(self, index:QModelIndex, role = Qt.DisplayRole):
+        if not index.isValid() or self._roms_list is None:
+            return None
 
-        if not exe_path:
-            self._raise_no_exe_exception()
+        if role == Qt.DisplayRole:
+            return self._roms_list.get_name(index.row())
 
-        run_pattern_index = self._find_rom_run_pattern_index(rom_path)
+        if role == Qt.ToolTipRole:
+            return self._roms_list.get_pathname(index.row())
 
-        if run_pattern_index is None:
-            # should not get here
-            self._raise_no_rom_run_pattern_exception(rom_path)
+        return None
 
-        run_pattern = self.run_patterns[run_pattern_index]
 
-        run_pattern_data = {
-            'exe_path': exe_path,
-            'rom_path': rom_path,
-            'roms_path': self.get_full_roms_path(),
-            'bios_path': self.bios_path
-        }
+    def set_roms_list(self, roms_list:Optional[RomsList]):
+        self.beginResetModel()
+        self._roms_list = roms_list
+        self.endResetModel()
 
-        if self.custom_data:
-            run_pattern_data.update(self.custom_data)
 
-        if self.run_patterns_pre_commands and run_pattern_index < len(self.run_patterns_pre_commands):
-            self._run_pre_commands(self.run_patterns_pre_commands[run_pattern_index], run_pattern_data)
+    def append_roms_list(self, roms_list:RomsList):
+        if not len(roms_list):
+            return
 
-        rom_config = self._find_rom_config(rom_path)
+        row_count = self.rowCount()
 
-        if rom_config:
-            run_pattern_data.update(rom_config)
+        self.beginInsertRows(QModelIndex(), row_count, row_count + len(roms_list) - 1)
 
-        run_pattern = self._process_extended_pattern(run_pattern, rom_path, run_pattern_data)
-        run_pattern_data = Utils.adjust_dict_all_to_system_path(run_pattern_data)
-        run_command_list = json.loads(run_pattern)
+        if self._roms_list is None:
+            self._roms_list = RomsList({})
 
-        for ipattern_index, ipattern_item in enumerate(run_command_list.copy()):
-            run_command_list[ipattern_index] = ipattern_item.format(**run_pattern_data)
+        self._roms_list.extend(roms_list)
+        self.endInsertRows()
 
-        run_command_str = ' '.join(run_command_list)
-        print('Running command: ' + run_command_str)
 
-        self._running_rom = subprocess.Popen(run_command_list, cwd=os.path.dirname(exe_path))
+    def get_rom_pathname(self, row:int) -> Optional[str]:
+        if not self._roms_list:
+            return None
 
-        return self._running_rom
+        return self._roms_list.get_pathname(row)
 
 
-    def run_gui(self) -> subprocess:
-        exe_path = self.get_gui_executable()
+    def get_rom_name(self, row:int) -> Optional[str]:
+        if not self._roms_list:
+            return None
 
-        if not exe_path:
-            self._raise_no_exe_exception()
+        return self._roms_list.get_name(row)
 
-        self._running_rom = subprocess.Popen([exe_path], cwd=os.path.dirname(exe_path))
 
-        return self._running_rom
+    def get_rom_row(self, pathname:str) -> int:
+        if not self._roms_list:
+            return -1
+
+        return self._roms_list.get_row(pathname)
 
 
 @typechecked_class_decorator()
@@ -1274,17 +3073,64 @@ class MainWindow(QDialog):
         self._fix_game_title2 = self._config_global_section['fix_game_title2'] == '1'
         self._fix_game_title3 = self._config_global_section['fix_game_title3'] == '1'
         self._unpack_to_tmp = self._config_global_section['unpack_to_tmp'] == '1'
+        self._unpack_native = self._config_global_section.get('unpack_native', '1') == '1'
+        self._roms_index = None
+
+        if self._config_global_section.get('roms_index', '1') == '1':
+            self._roms_index = RomsIndex(DEFAULT_ROMS_INDEX_PATHNAME)
+
+        self._unpack_cache = None
+
+        if self._unpack_to_tmp:
+            self._unpack_cache = UnpackCache(
+                os.path.join(tempfile.gettempdir(), UNPACK_CACHE_DIRECTORY),
+                int(self._config_global_section.get('unpack_cache_size', '4096')) * 1024 * 1024
+            )
 
         self._antimicro_path = Utils.adjust_to_system_path(self._config_global_section['antimicro_path'])
         self._antimicro_profiles_path = Utils.adjust_to_system_path(self._config_global_section['antimicro_profiles_path'])
 
-        self._need_update_cover = True
         self._best_scales = {}
+        self._best_scales_label_size = None
+        self._covers_cache = None
+
+        covers_cache_size = int(self._config_global_section.get('covers_cache_size', '64'))
+
+        if covers_cache_size > 0:
+            self._covers_cache = CoversCache(covers_cache_size * 1024 * 1024)
+
         self._antimicro_profiles = []
+        self._antimicro_profiles_files = None
         self._selected_antimicro_profile = None
         self._antimicro_process = None
+        self._directories_watcher = None
+        self._watched_roms_directories = {}
+        self._changed_paths = set()
+        self._polled_paths = {}
+        self._roms_update_tasks = []
+        self._roms_scan_task = None
+        self._roms_scan_generation = 0
+        self._roms_scan_selected_rom = None
+        self._covers_prefetch_task = None
+
+        # not the global pool, Qt uses it for its own work (eg. smooth scaling
+        # of big images) while GUI thread waits with GIL held, so tasks there
+        # waiting for GIL would block it forever
+        self._tasks_pool = QThreadPool(self)
+        self._covers_prefetch_rows = int(self._config_global_section.get('covers_prefetch_rows', '5'))
+
+        # roms are unpacked at idle priority, so their own pool
+        self._unpack_warm_pool = QThreadPool(self)
+        self._unpack_warm_pool.setMaxThreadCount(max(1, int(self._config_global_section.get('unpack_warm_workers', '2'))))
+        self._unpack_warm_delay = int(self._config_global_section.get('unpack_warm_delay', '1000'))
+        self._unpack_warm_tasks = []
         self._emulator_process = None
 
+        # own pool, so launch does not wait for scans or other tasks
+        self._launch_pool = QThreadPool(self)
+        self._launch_pool.setMaxThreadCount(1)
+        self._launch_task = None
+
         self.setWindowTitle(APP_NAME)
         self.setMinimumSize(minimum_window_width, minimum_window_height)
         self.setWindowIcon(self._icon_from_base64(APP_ICON))
@@ -1295,9 +3141,10 @@ class MainWindow(QDialog):
         self._main_layout = QVBoxLayout(self)
         self._horizon_layout = QHBoxLayout()
         self._emu_selector = QComboBox()
-        self._games_list = QListWidget()
+        self._games_list = QListView()
+        self._games_model = RomsListModel(self)
         self._message_label = QLabel()
-        self._run_game_button = QPushButton('Run selected game')
+        self._run_game_button = QPushButton(RUN_GAME_BUTTON_TEXT)
         self._cover_label = None
 
         if self._show_covers:
@@ -1338,6 +3185,7 @@ class MainWindow(QDialog):
             self._cover_label.setAlignment(Qt.AlignHCenter | Qt.AlignVCenter)
             self._cover_label.setSizePolicy(QSizePolicy.Ignored, QSizePolicy.Ignored)
 
+        self._games_list.setModel(self._games_model)
         self._games_list.setUniformItemSizes(True)
         self._games_list.setContextMenuPolicy(Qt.CustomContextMenu)
         self._games_list.customContextMenuRequested[QtCore.QPoint].connect(self._games_list_right_menu)
@@ -1359,6 +3207,14 @@ class MainWindow(QDialog):
         self._systems_base_path = self._config_global_section['systems_base_path']
         self._roms_base_path = self._config_global_section['roms_base_path']
         self._covers_base_realpath = Utils.adjust_to_system_path(self._config_global_section['covers_base_path'])
+        self._covers_index = CoversIndex(self._covers_base_realpath)
+        self._covers_thumbnails = CoversThumbnails(None)
+
+        if self._config_global_section.get('covers_thumbnails', '1') == '1':
+            self._covers_thumbnails = CoversThumbnails(
+                os.path.join(self._covers_base_realpath, COVERS_THUMBNAILS_DIRECTORY),
+                int(self._config_global_section.get('covers_thumbnails_size', '256')) * 1024 * 1024
+            )
         self._themes_base_realpath = Utils.adjust_to_system_path(self._config_global_section['themes_base_path'])
         self._theme = self._config_global_section['theme']
         self._bios_path = self._config_global_section['bios_path']
@@ -1369,7 +3225,7 @@ class MainWindow(QDialog):
 
         self._emu_selector.currentIndexChanged.connect(self._emu_selector_current_index_changed)
         self._games_list.doubleClicked.connect(self._games_list_double_clicked)
-        self._games_list.currentRowChanged.connect(self._games_list_current_row_changed)
+        self._games_list.selectionModel().currentRowChanged.connect(self._games_list_current_row_changed)
 
         self._run_game_button.clicked.connect(self._run_game_button_clicked)
 
@@ -1387,12 +3243,23 @@ class MainWindow(QDialog):
 
         self._adjust_gui()
 
-        if self._show_covers:
-            self._cover_timer = QTimer(self)
-            self._cover_timer.timeout.connect(self._cover_timer_timeout)
-            self._cover_timer.start(10)
-        else:
-            self._need_update_cover = False
+        if self._config_global_section.get('watch_directories', '0') == '1':
+            self._start_directories_watcher()
+
+        if self._covers_thumbnails.thumbnails_path:
+            self._tasks_pool.start(CoversThumbnailsCleanTask(self._covers_thumbnails, self._get_covers_directories()))
+
+        # cover is updated once the selection or window size settles,
+        # so holding a key down does not load every cover on the way
+        self._cover_timer = QTimer(self)
+        self._cover_timer.setSingleShot(True)
+        self._cover_timer.timeout.connect(self._cover_timer_timeout)
+
+        self._update_cover()
+
+        self._unpack_warm_timer = QTimer(self)
+        self._unpack_warm_timer.setSingleShot(True)
+        self._unpack_warm_timer.timeout.connect(self._unpack_warm_timer_timeout)
 
         self._antimicro_timer = QTimer(self)
         self._antimicro_timer.timeout.connect(self._antimicro_timer_timeout)
@@ -1446,6 +3313,7 @@ class MainWindow(QDialog):
         copy_rom_filename_action = QAction('Copy rom &filename', self, triggered = self._games_list_copy_rom_filename)
         google_game = QAction('&Google it', self, triggered = self._games_list_google_game)
         run_game = QAction('&Run', self, triggered = self._run_selected_game)
+        warm_system = QAction('&Unpack all games in background', self, triggered = self._games_list_warm_system)
 
         right_menu.addAction(copy_game_name_action)
         right_menu.addAction(copy_system_game_name_action)
@@ -1454,11 +3322,69 @@ class MainWindow(QDialog):
         right_menu.addAction(google_game)
         right_menu.addAction(run_game)
 
-        right_menu.exec_(QtGui.QCursor.pos())
+        current_emulator = self._get_current_emulator()
+
+        if current_emulator and current_emulator.can_warm_roms():
+            right_menu.addAction(warm_system)
+
+        right_menu.exec_(QtGui.QCursor.pos())
+
+
+    def _update_cover(self):
+        if not self._show_covers:
+            return
+
+        self._cover_timer.start(COVER_UPDATE_DELAY)
+
+
+    def _cover_timer_timeout(self):
+        self._show_selected_game_cover()
+
+
+    def _start_unpack_warm_task(self, emulator:Emulator, roms_paths:list, is_batch:bool, priority:int = 0):
+        task = UnpackWarmTask(emulator, roms_paths, is_batch)
+
+        self._unpack_warm_tasks = [itask for itask in self._unpack_warm_tasks if not itask.finished]
+        self._unpack_warm_tasks.append(task)
+        self._unpack_warm_pool.start(task, priority)
+
+
+    def _cancel_unpack_warm_tasks(self):
+        # queued ones are dropped, running ones stop after current rom
+        self._unpack_warm_pool.clear()
+
+        for itask in self._unpack_warm_tasks:
+            itask.cancel()
+
+        self._unpack_warm_tasks = []
+
+
+    def _unpack_warm_timer_timeout(self):
+        current_emulator = self._get_current_emulator()
+        rom_path = self._get_current_selected_rom()
+
+        if not current_emulator or not rom_path:
+            return
+
+        # before the batch ones, it is the one going to be run
+        self._start_unpack_warm_task(current_emulator, [os.path.abspath(rom_path)], False, 1)
 
 
-    def _cover_timer_timeout(self):
-        self._show_selected_game_cover()
+    def _games_list_warm_system(self):
+        current_emulator = self._get_current_emulator()
+
+        if not current_emulator:
+            return
+
+        roms_paths = [os.path.abspath(irom_path) for irom_path in current_emulator.get_emulator_roms_list().pathnames]
+
+        print('Unpacking {count} roms of {system_name} in background'.format(
+            count=len(roms_paths),
+            system_name=current_emulator.system_name
+        ))
+
+        for istart in range(0, len(roms_paths), UNPACK_WARM_BATCH_SIZE):
+            self._start_unpack_warm_task(current_emulator, roms_paths[istart:istart + UNPACK_WARM_BATCH_SIZE], True)
 
 
     def _antimicro_timer_timeout(self):
@@ -1482,6 +3408,10 @@ class MainWindow(QDialog):
             if self._emulator_process != None:
                 self._games_list.setFocus()
 
+                # unpacked roms of the game can be evicted now
+                if self._unpack_cache:
+                    self._unpack_cache.release_in_use()
+
             self._emulator_process = None
 
 
@@ -1503,7 +3433,218 @@ class MainWindow(QDialog):
 
     def resizeEvent(self, event):
         self._best_scales = {}
-        self._need_update_cover = True
+        self._clear_covers_cache()
+        self._update_cover()
+
+
+    def closeEvent(self, event):
+        self._cancel_unpack_warm_tasks()
+
+        # game would be started without the frontend otherwise
+        if self._launch_task:
+            self._launch_task.cancel()
+
+        if show_startup_time:
+            self.print_covers_cache_stats()
+
+        super(MainWindow, self).closeEvent(event)
+
+
+    def _start_directories_watcher(self):
+        # QFileSystemWatcher uses inotify on Linux (or the native API of other
+        # systems), paths it cannot watch (eg. inotify watches limit reached)
+        # are polled for mtime changes
+        self._directories_watcher = QFileSystemWatcher(self)
+        self._directories_watcher.directoryChanged.connect(self._directories_watcher_path_changed)
+        self._directories_watcher.fileChanged.connect(self._directories_watcher_path_changed)
+
+        self._directories_watcher_timer = QTimer(self)
+        self._directories_watcher_timer.setSingleShot(True)
+        self._directories_watcher_timer.timeout.connect(self._directories_watcher_timer_timeout)
+
+        self._directories_poll_timer = QTimer(self)
+        self._directories_poll_timer.timeout.connect(self._directories_poll_timer_timeout)
+
+        for iemulator in self._emulators:
+            self._watch_emulator_roms(iemulator)
+
+        self._watch_paths(self._get_covers_directories())
+        self._watch_paths(self._get_antimicro_profiles_directories())
+
+
+    def _get_covers_directories(self) -> List[str]:
+        covers_paths = [self._covers_base_realpath]
+
+        for iemulator in self._emulators:
+            covers_paths.append(os.path.join(self._covers_base_realpath, iemulator.raw_roms_path))
+
+        return covers_paths
+
+
+    def _get_path_mtime(self, path:str) -> Optional[int]:
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+
+    def _watch_paths(self, paths:list):
+        if not self._directories_watcher:
+            return
+
+        # not existing ones are added when their parent directory changes
+        watched_paths = set(self._directories_watcher.directories() + self._directories_watcher.files())
+        new_paths = [
+            ipath for ipath in paths
+            if ipath not in watched_paths and ipath not in self._polled_paths and os.path.exists(ipath)
+        ]
+
+        if not new_paths:
+            return
+
+        failed_paths = self._directories_watcher.addPaths(new_paths)
+
+        if not failed_paths:
+            return
+
+        print('Cannot watch {count} directories, eg. {path}, polling them'.format(count=len(failed_paths), path=failed_paths[0]))
+
+        for ipath in failed_paths:
+            self._polled_paths[ipath] = self._get_path_mtime(ipath)
+
+        if not self._directories_poll_timer.isActive():
+            self._directories_poll_timer.start(DIRECTORIES_POLL_INTERVAL)
+
+
+    def _directories_poll_timer_timeout(self):
+        for ipath, imtime in list(self._polled_paths.items()):
+            mtime = self._get_path_mtime(ipath)
+
+            if mtime != imtime:
+                self._polled_paths[ipath] = mtime
+                self._directories_watcher_path_changed(ipath)
+
+
+    def _watch_emulator_roms(self, emulator:Emulator):
+        if not self._directories_watcher:
+            return
+
+        roms_directories = emulator.get_roms_directories()
+
+        if not roms_directories:
+            # not scanned yet
+            return
+
+        # roms.ini changes do not always change the directory
+        roms_directories.append(os.path.join(roms_directories[0], DEFAULT_ROMS_PATHNAME))
+
+        for idirectory in roms_directories:
+            watching_emulators = self._watched_roms_directories.setdefault(idirectory, [])
+
+            if emulator not in watching_emulators:
+                watching_emulators.append(emulator)
+
+        self._watch_paths(roms_directories)
+
+
+    def _get_antimicro_profiles_directories(self) -> List[str]:
+        if not os.path.exists(self._antimicro_profiles_path):
+            return []
+
+        return [idirectory for (idirectory, idirectories, ifiles) in os.walk(self._antimicro_profiles_path)]
+
+
+    def _directories_watcher_path_changed(self, path:str):
+        # changes usually come in bursts (eg. copying many files)
+        # so wait a moment and handle them all at once
+        self._changed_paths.add(path)
+        self._directories_watcher_timer.start(DIRECTORIES_WATCHER_DELAY)
+
+
+    def _directories_watcher_timer_timeout(self):
+        changed_paths = self._changed_paths
+        self._changed_paths = set()
+
+        try:
+            changed_emulators = []
+
+            for ipath in changed_paths:
+                for iemulator in self._watched_roms_directories.get(ipath, []):
+                    if iemulator not in changed_emulators:
+                        changed_emulators.append(iemulator)
+
+            for iemulator in changed_emulators:
+                self._update_emulator_roms(iemulator)
+
+            covers_changed = any(Utils.is_sub_path(ipath, self._covers_base_realpath) for ipath in changed_paths)
+            profiles_changed = any(Utils.is_sub_path(ipath, self._antimicro_profiles_path) for ipath in changed_paths)
+
+            if covers_changed:
+                # covers directory of a system may be created later
+                self._watch_paths(self._get_covers_directories())
+
+                self._best_scales = {}
+                self._covers_index.clear()
+                self._clear_covers_cache()
+                self._update_cover()
+
+            if profiles_changed:
+                self._watch_paths(self._get_antimicro_profiles_directories())
+                self._update_antimicro_profiles()
+        except Exception as x:
+            self._log_exception(x)
+
+
+    def _update_emulator_roms(self, emulator:Emulator):
+        if emulator == self._get_current_emulator():
+            # rescan in background, keep selected rom
+            self._show_current_emulator_roms(cached=False, selected_rom=self._get_current_selected_rom())
+
+            return
+
+        # rescan only changed directories of the emulator, in background too
+        roms_update_task = RomsScanTask(0, emulator, False)
+        roms_update_task.signals.emulator_scanned.connect(self._roms_update_task_emulator_scanned)
+        roms_update_task.signals.scan_failed.connect(self._roms_update_task_scan_failed)
+
+        # kept until finished, its signals would be gone otherwise
+        self._roms_update_tasks.append(roms_update_task)
+        self._tasks_pool.start(roms_update_task)
+
+
+    def _remove_roms_update_task(self, signals:QObject):
+        self._roms_update_tasks = [itask for itask in self._roms_update_tasks if itask.signals is not signals]
+
+
+    def _roms_update_task_emulator_scanned(self, emulator:Emulator):
+        self._remove_roms_update_task(self.sender())
+        self._watch_emulator_roms(emulator)
+
+        self._emu_selector.setItemText(self._emulators.index(emulator), self._format_emulator_name(emulator))
+
+
+    def _roms_update_task_scan_failed(self, generation:int, x:Exception):
+        self._remove_roms_update_task(self.sender())
+
+        print('Cannot update roms: ' + str(x))
+
+
+    def _update_antimicro_profiles(self):
+        self._antimicro_profiles_files = None
+
+        selected_profile = None
+
+        if self._selected_antimicro_profile:
+            selected_profile = self._antimicro_profiles[self._selected_antimicro_profile - 1]
+
+        self._load_antimicro_profiles()
+
+        if selected_profile in self._antimicro_profiles:
+            # keep selected profile, _switch_antimicro_profile(1) moves to the next one
+            self._selected_antimicro_profile = self._antimicro_profiles.index(selected_profile)
+            self._switch_antimicro_profile(1)
+        else:
+            self._switch_antimicro_profile(0)
 
 
     def _switch_emulator(self, down: bool):
@@ -1541,9 +3682,10 @@ class MainWindow(QDialog):
         emulator = self._emulators[current_index]
 
         exe_pathname = emulator.get_emulator_executable()
-        roms = emulator.get_emulator_roms()
+        roms = emulator.get_cached_roms()
 
-        if exe_pathname and roms:
+        if exe_pathname and (roms or roms is None):
+            # when roms are not scanned yet, it is checked again after the scan
             self._show_message('')
             return
 
@@ -1665,13 +3807,18 @@ class MainWindow(QDialog):
             return None
 
         emulator = self._emulators[current_emulator_index]
-        profiles = sorted(list(pathlib.Path(self._antimicro_profiles_path).rglob('*' + ANTIMICRO_PROFILE_EXTENSION)))
 
-        for iprofile in profiles:
-            if not iprofile.name.startswith(emulator.internal_name):
+        if self._antimicro_profiles_files is None or not self._directories_watcher:
+            # without watcher look for new profiles on every switch
+            self._antimicro_profiles_files = [str(iprofile) for iprofile in sorted(list(
+                pathlib.Path(self._antimicro_profiles_path).rglob('*' + ANTIMICRO_PROFILE_EXTENSION)
+            ))]
+
+        for iprofile in self._antimicro_profiles_files:
+            if not os.path.basename(iprofile).startswith(emulator.internal_name):
                 continue
 
-            self._antimicro_profiles.append(str(iprofile))
+            self._antimicro_profiles.append(iprofile)
 
 
     def _format_antimicro_profile_name(self, profile_pathname:str) -> str:
@@ -1810,7 +3957,10 @@ class MainWindow(QDialog):
             'fix_game_title': self._fix_game_title,
             'fix_game_title2': self._fix_game_title2,
             'fix_game_title3': self._fix_game_title3,
-            'unpack_to_tmp': self._unpack_to_tmp
+            'unpack_to_tmp': self._unpack_to_tmp,
+            'unpack_native': self._unpack_native,
+            'roms_index': self._roms_index,
+            'unpack_cache': self._unpack_cache
         }
 
 
@@ -1835,12 +3985,33 @@ class MainWindow(QDialog):
         return processed_paths
 
 
-    def _load_emulators(self) -> list:
+    def _is_emulator_visible(self, emulator:Emulator) -> bool:
+        # runs in scan_workers threads
         show_non_roms_emulator = self._config_global_section['show_non_roms_emulator'] == '1'
         show_non_exe_emulator = self._config_global_section['show_non_exe_emulator'] == '1'
+        show_emulator_roms_count = self._config_global_section['show_emulator_roms_count'] == '1'
+
+        if not show_non_exe_emulator:
+            # check if emulator executable exists
+            if not emulator.get_emulator_executable():
+                return False
+
+        if not show_non_roms_emulator:
+            # check if emulator have roms
+            if not emulator.get_emulator_roms():
+                return False
+        elif show_emulator_roms_count:
+            # roms count will be shown next to system name
+            emulator.get_emulator_roms()
+
+        return True
+
+
+    def _load_emulators(self) -> list:
         sort_emulators = self._config_global_section['sort_emulators'] == '1'
+        scan_workers = max(1, int(self._config_global_section.get('scan_workers', '4')))
 
-        emulators = []
+        all_emulators = []
 
         for isection_name in self._config.sections():
             if not isection_name.startswith('emulator.'):
@@ -1849,19 +4020,14 @@ class MainWindow(QDialog):
             isection_data = dict(self._config[isection_name].items())
             emulator_config = self._prepare_emulator_config(isection_name, isection_data)
 
-            iemulator = Emulator(**emulator_config)
-
-            if not show_non_exe_emulator:
-                # check if emulator executable exists
-                if not iemulator.get_emulator_executable():
-                    continue
+            all_emulators.append(Emulator(**emulator_config))
 
-            if not show_non_roms_emulator:
-                # check if emulator have roms
-                if not iemulator.get_emulator_roms():
-                    continue
+        # look for executables and scan roms of many systems at once,
+        # map() gives results in config order
+        with concurrent.futures.ThreadPoolExecutor(max_workers=scan_workers) as executor:
+            visible = list(executor.map(self._is_emulator_visible, all_emulators))
 
-            emulators.append(iemulator)
+        emulators = [iemulator for iemulator, ivisible in zip(all_emulators, visible) if ivisible]
 
         if sort_emulators:
             emulators = sorted(emulators, key=operator.attrgetter('system_name'))
@@ -1869,6 +4035,97 @@ class MainWindow(QDialog):
         return emulators
 
 
+    def benchmark_scan(self):
+        # full scans of all systems, without roms index, best of few rounds
+        # with and without type checking
+        best_times = {True: None, False: None}
+        roms_count = 0
+
+        for iround in range(BENCHMARK_SCAN_ROUNDS):
+            for ichecking in [True, False]:
+                set_typechecking(ichecking)
+
+                start_time = time.perf_counter()
+                roms_count = 0
+
+                for isection_name in self._config.sections():
+                    if not isection_name.startswith('emulator.'):
+                        continue
+
+                    isection_data = dict(self._config[isection_name].items())
+                    emulator_config = self._prepare_emulator_config(isection_name, isection_data)
+                    emulator_config['roms_index'] = None
+
+                    roms = Emulator(**emulator_config).get_emulator_roms(False)
+                    roms_count += len(roms) if roms else 0
+
+                scan_time = time.perf_counter() - start_time
+
+                if best_times[ichecking] is None or scan_time < best_times[ichecking]:
+                    best_times[ichecking] = scan_time
+
+        set_typechecking(typechecked_class_decorator_enabled)
+
+        print('Scan of {count} roms with type checking: {time:.3f}s'.format(count=roms_count, time=best_times[True]))
+        print('Scan of {count} roms without type checking: {time:.3f}s'.format(count=roms_count, time=best_times[False]))
+
+
+    def benchmark_titles(self):
+        # numbering of duplicated titles, like No-Intro sets where many
+        # titles are the same after rom_name_remove, some titles clash
+        # with numbered names
+        emulator = None
+
+        for isection_name in self._config.sections():
+            if not isection_name.startswith('emulator.'):
+                continue
+
+            isection_data = dict(self._config[isection_name].items())
+            emulator_config = self._prepare_emulator_config(isection_name, isection_data)
+            emulator_config['roms_index'] = None
+
+            emulator = Emulator(**emulator_config)
+            break
+
+        if not emulator:
+            print('No emulators configured')
+            return
+
+        titles_random = random.Random(0)
+        roms = {}
+
+        for iposition in range(BENCHMARK_TITLES_COUNT):
+            ititle = 'Game ' + str(titles_random.randrange(BENCHMARK_TITLES_DISTINCT))
+
+            if titles_random.randrange(50) == 0:
+                ititle += ' (2)'
+
+            roms['game' + str(iposition) + '.zip'] = ititle
+
+        best_times = {True: None, False: None}
+
+        for iround in range(BENCHMARK_SCAN_ROUNDS):
+            for ichecking in [True, False]:
+                set_typechecking(ichecking)
+
+                # _count_rom_titles changes the dict
+                round_roms = dict(roms)
+
+                start_time = time.perf_counter()
+                emulator._count_rom_titles(round_roms)
+                count_time = time.perf_counter() - start_time
+
+                if best_times[ichecking] is None or count_time < best_times[ichecking]:
+                    best_times[ichecking] = count_time
+
+        set_typechecking(typechecked_class_decorator_enabled)
+
+        distinct_count = len(set(roms.values()))
+
+        print('Numbering of {count} titles ({distinct} distinct) with type checking: {time:.3f}s'.format(count=len(roms), distinct=distinct_count, time=best_times[True]))
+        print('Numbering of {count} titles ({distinct} distinct) without type checking: {time:.3f}s'.format(count=len(roms), distinct=distinct_count, time=best_times[False]))
+
+
     def _message_box(self, text: str, error:bool = False):
         msg = QMessageBox()
         msg.setTextFormat(Qt.RichText)
@@ -1906,52 +4163,113 @@ class MainWindow(QDialog):
         return self._emulators[current_index]
 
 
-    def _show_current_emulator_roms(self, first_run:bool = False, cached:bool = True):
-        try:
-            self._games_list.blockSignals(True)
-            self._games_list.clear()
+    def _show_current_emulator_roms(self, first_run:bool = False, cached:bool = True, selected_rom:Optional[str] = None):
+        # roms are scanned in background, the list model gets them as they
+        # are found and then the final list, a newer call drops results
+        # of the previous one
+        self._roms_scan_generation += 1
 
-            emulator = self._get_current_emulator()
+        if self._roms_scan_task:
+            self._roms_scan_task.cancel()
+            self._roms_scan_task = None
 
-            if not emulator:
-                return
+        self._set_games_list_roms(None)
 
-            self._roms = self._get_current_emulator().get_emulator_roms(cached)
+        self._roms_scan_first_run = first_run
+        self._roms_scan_selected_rom = selected_rom
 
-            if not self._roms:
-                return
+        emulator = self._get_current_emulator()
 
-            for pathname, name in self._roms.items():
-                item = QListWidgetItem(name)
-                item.setToolTip(pathname)
+        if not emulator:
+            return
 
-                self._games_list.addItem(item)
+        self._roms_scan_task = RomsScanTask(self._roms_scan_generation, emulator, cached)
+        self._roms_scan_task.signals.roms_found.connect(self._roms_scan_task_roms_found)
+        self._roms_scan_task.signals.scan_finished.connect(self._roms_scan_task_scan_finished)
+        self._roms_scan_task.signals.scan_failed.connect(self._roms_scan_task_scan_failed)
+
+        self._tasks_pool.start(self._roms_scan_task)
+
+
+    def _set_games_list_roms(self, roms_list:Optional[RomsList]):
+        self._games_list.selectionModel().blockSignals(True)
+        self._games_model.set_roms_list(roms_list)
+        self._games_list.selectionModel().blockSignals(False)
+
+
+    def _set_games_list_current_row(self, row:int):
+        self._games_list.setCurrentIndex(self._games_model.index(row))
 
-            if first_run:
-                self._games_list.setCurrentRow(0)
-                self._games_list.setFocus()
-        except Exception as x:
-            self._log_exception(x)
-        finally:
-            self._games_list.blockSignals(False)
+
+    def _roms_scan_task_roms_found(self, generation:int, roms_list:RomsList):
+        if generation != self._roms_scan_generation:
+            return
+
+        self._games_model.append_roms_list(roms_list)
+
+
+    def _roms_scan_task_scan_finished(self, generation:int, roms_list:RomsList):
+        if generation != self._roms_scan_generation:
+            return
+
+        self._roms_scan_task = None
+
+        emulator = self._get_current_emulator()
+
+        if self._games_list.currentIndex().isValid():
+            # selected while roms were being found
+            self._roms_scan_selected_rom = self._get_current_selected_rom()
+
+        self._set_games_list_roms(roms_list)
+        self._watch_emulator_roms(emulator)
+
+        selected_row = -1
+
+        if self._roms_scan_selected_rom:
+            selected_row = roms_list.get_row(self._roms_scan_selected_rom)
+
+        if selected_row >= 0:
+            self._set_games_list_current_row(selected_row)
+        elif (self._roms_scan_first_run or self._roms_scan_selected_rom) and roms_list:
+            # first run or selected rom is gone
+            self._set_games_list_current_row(0)
+
+        if self._roms_scan_first_run:
+            self._games_list.setFocus()
+
+            # first screen of games of newly selected system
+            row_height = max(self._games_list.sizeHintForRow(0), 1)
+            visible_rows = self._games_list.viewport().height() // row_height + 1
+
+            self._prefetch_covers(list(range(max(visible_rows, self._covers_prefetch_rows + 1))))
+
+        self._emu_selector.setItemText(self._emu_selector.currentIndex(), self._format_emulator_name(emulator))
+        self._show_warning_message()
+        self._update_cover()
+
+
+    def _roms_scan_task_scan_failed(self, generation:int, x:Exception):
+        if generation != self._roms_scan_generation:
+            return
+
+        self._roms_scan_task = None
+        self._log_exception(x)
 
 
     def _show_selected_game_cover(self):
-        if not self._need_update_cover or not self._show_covers:
+        if not self._show_covers:
             return
 
         if self._cover_label.isHidden():
             self._cover_label.clear()
-            self._need_update_cover = False
 
             return
 
         try:
             current_index = self._games_list.currentIndex()
 
-            if not current_index:
+            if not current_index.isValid():
                 self._cover_label.clear()
-                self._need_update_cover = False
 
                 return
 
@@ -1962,108 +4280,185 @@ class MainWindow(QDialog):
 
                 if not rom_path:
                     self._cover_label.clear()
-                    self._need_update_cover = False
 
                     return
 
                 cover_label_size = self._cover_label.size()
-                rom_basename = os.path.basename(rom_path)
-
-                search_paths = [
-                    os.path.join(self._covers_base_realpath, rom_basename + '.png'),
-                    os.path.join(self._covers_base_realpath, rom_basename + '.jpg'),
-                    os.path.join(self._covers_base_realpath, rom_basename + '.jpeg'),
-                    os.path.join(self._covers_base_realpath, current_emulator.raw_roms_path, rom_basename + '.png'),
-                    os.path.join(self._covers_base_realpath, current_emulator.raw_roms_path, rom_basename + '.jpg'),
-                    os.path.join(self._covers_base_realpath, current_emulator.raw_roms_path, rom_basename + '.jpeg'),
-                ]
-
-                cover_file_pathname = Utils.find_file_from_list(search_paths)
+                cover_file_pathname = self._covers_index.find_rom_cover(current_emulator.raw_roms_path, rom_path)
 
                 if not cover_file_pathname:
                     self._cover_label.clear()
-                    self._need_update_cover = False
 
                     return
 
-                if current_emulator.internal_name not in self._best_scales:
-                    self._best_scales[current_emulator.internal_name] = {}
+                first_rom_cover_size = self._get_first_rom_cover_size(current_emulator, cover_label_size)
 
-                emulator_best_scales = self._best_scales[current_emulator.internal_name]
+                pixmap = self._get_cover_pixmap(current_emulator, cover_file_pathname, cover_label_size, first_rom_cover_size)
 
-                covers_same_size = self._config_global_section['covers_same_size']
-                first_rom_cover_size = None
+                self._cover_label.setPixmap(pixmap)
+        except Exception as x:
+            self._log_exception(x)
 
-                if covers_same_size:
-                    first_rom_path = self._get_rom_by_index(0)
-                    first_rom_basename = os.path.basename(first_rom_path)
 
-                    first_rom_cover_search_paths = [
-                        os.path.join(self._covers_base_realpath, first_rom_basename + '.png'),
-                        os.path.join(self._covers_base_realpath, first_rom_basename + '.jpg'),
-                        os.path.join(self._covers_base_realpath, first_rom_basename + '.jpeg'),
-                        os.path.join(self._covers_base_realpath, current_emulator.raw_roms_path, first_rom_basename + '.png'),
-                        os.path.join(self._covers_base_realpath, current_emulator.raw_roms_path, first_rom_basename + '.jpg'),
-                        os.path.join(self._covers_base_realpath, current_emulator.raw_roms_path, first_rom_basename + '.jpeg'),
-                    ]
+    def _get_emulator_best_scales(self, emulator_name:str, cover_label_size:QtCore.QSize) -> dict:
+        # sizes are computed for the label size, it can change
+        # without resizing the window
+        if cover_label_size != self._best_scales_label_size:
+            self._best_scales = {}
+            self._best_scales_label_size = cover_label_size
 
-                    first_rom_cover_pathname = Utils.find_file_from_list(first_rom_cover_search_paths)
+        return self._best_scales.setdefault(emulator_name, {})
 
-                    if first_rom_cover_pathname:
-                        if first_rom_cover_pathname in emulator_best_scales:
-                            first_rom_cover_size = emulator_best_scales[first_rom_cover_pathname]
-                        else:
-                            first_rom_cover_size = self._rescale_cover(current_emulator, first_rom_cover_pathname, cover_label_size).size()
 
-                            first_rom_cover_size = (first_rom_cover_size.width(), first_rom_cover_size.height())
+    def _get_first_rom_cover_size(self, emulator:Emulator, cover_label_size:QtCore.QSize) -> Optional[tuple]:
+        emulator_best_scales = self._get_emulator_best_scales(emulator.internal_name, cover_label_size)
 
-                pixmap = self._rescale_cover(current_emulator, cover_file_pathname, cover_label_size, first_rom_cover_size)
+        covers_same_size = self._config_global_section['covers_same_size']
+        first_rom_cover_size = None
 
-                self._cover_label.setPixmap(pixmap)
-        except Exception as x:
-            self._log_exception(x)
+        if covers_same_size:
+            first_rom_path = self._get_rom_by_index(0)
+            first_rom_cover_pathname = self._covers_index.find_rom_cover(emulator.raw_roms_path, first_rom_path) if first_rom_path else None
 
-        self._need_update_cover = False
+            if first_rom_cover_pathname:
+                if first_rom_cover_pathname in emulator_best_scales:
+                    first_rom_cover_size = emulator_best_scales[first_rom_cover_pathname]
+                else:
+                    first_rom_cover_size = self._get_cover_pixmap(emulator, first_rom_cover_pathname, cover_label_size).size()
 
+                    first_rom_cover_size = (first_rom_cover_size.width(), first_rom_cover_size.height())
 
-    def _rescale_cover(self, emulator:Emulator, cover_file_pathname:str, cover_label_size:QtCore.QSize, first_rom_cover_size:Optional[tuple] = None) -> QtGui.QPixmap:
-        emulator_best_scales = self._best_scales[emulator.internal_name]
+        return first_rom_cover_size
 
-        pixmap = QtGui.QPixmap(cover_file_pathname)
-        rescaled = False
 
-        if first_rom_cover_size:
-            pixmap = pixmap.scaled(first_rom_cover_size[0], first_rom_cover_size[1], mode=QtCore.Qt.SmoothTransformation)
+    def _clear_covers_cache(self):
+        if not self._covers_cache:
+            return
 
-            rescaled = True
+        self._covers_cache.clear()
 
-        if not rescaled:
-            if cover_file_pathname in emulator_best_scales and emulator_best_scales[cover_file_pathname][0] > 0:
-                pixmap = pixmap.scaled(emulator_best_scales[cover_file_pathname][0], emulator_best_scales[cover_file_pathname][1], mode=QtCore.Qt.SmoothTransformation)
-            else:
-                pixmap_size = pixmap.size()
-                pixmap_original = pixmap
-                new_width = pixmap_size.width()
 
-                while pixmap_size.width() > cover_label_size.width() or pixmap_size.height() > cover_label_size.height():
-                    new_width = int(pixmap_size.width() - ((pixmap_size.width() / 100) * 10))
+    def print_covers_cache_stats(self):
+        if not self._covers_cache:
+            return
+
+        print('Covers cache: {hits} hits, {misses} misses, {count} pixmaps of {size} bytes, {dropped_size} bytes dropped'.format(
+            **self._covers_cache.get_stats()
+        ))
+
+
+    def _get_cover_pixmap(self, emulator:Emulator, cover_file_pathname:str, cover_label_size:QtCore.QSize, first_rom_cover_size:Optional[tuple] = None) -> QtGui.QPixmap:
+        if not self._covers_cache:
+            return self._rescale_cover(emulator, cover_file_pathname, cover_label_size, first_rom_cover_size)
+
+        # changed cover file gets a new key
+        key = (
+            cover_file_pathname,
+            cover_label_size.width(),
+            cover_label_size.height(),
+            os.stat(cover_file_pathname).st_mtime_ns,
+            first_rom_cover_size
+        )
 
-                    pixmap = pixmap_original.scaledToWidth(new_width, mode=QtCore.Qt.SmoothTransformation)
-                    pixmap_size = pixmap.size()
+        pixmap = self._covers_cache.get(key)
 
-                    if pixmap_size.width() == 0:
-                        break
+        if pixmap is None:
+            pixmap = self._rescale_cover(emulator, cover_file_pathname, cover_label_size, first_rom_cover_size)
 
-                emulator_best_scales[cover_file_pathname] = (int(pixmap_size.width()), int(pixmap_size.height()))
+            self._covers_cache.put(key, pixmap)
 
         return pixmap
 
 
-    def _get_rom_by_index(self, index: int) -> Optional[str]:
-        if not self._roms:
-            return None
+    def _prefetch_covers(self, rows:list):
+        if not self._show_covers or not self._covers_cache or self._covers_prefetch_rows <= 0:
+            return
+
+        if self._covers_prefetch_task:
+            self._covers_prefetch_task.cancel()
+            self._covers_prefetch_task = None
+
+        emulator = self._get_current_emulator()
+
+        if not emulator:
+            return
+
+        roms_paths = []
+
+        for irow in rows:
+            rom_path = self._get_rom_by_index(irow)
+
+            if rom_path:
+                roms_paths.append(rom_path)
+
+        cover_label_size = self._cover_label.size()
+        first_rom_cover_size = self._get_first_rom_cover_size(emulator, cover_label_size)
+        loaded_covers = set()
+
+        for ikey in self._covers_cache.keys():
+            if ikey[1] == cover_label_size.width() and ikey[2] == cover_label_size.height() and ikey[4] == first_rom_cover_size:
+                loaded_covers.add(ikey[0])
+
+        # covers are scaled in background the same way as _rescale_cover does
+        self._covers_prefetch_task = CoversPrefetchTask(
+            roms_paths,
+            self._covers_index,
+            emulator,
+            cover_label_size,
+            first_rom_cover_size,
+            {ipathname: isize for ipathname, isize in self._get_emulator_best_scales(emulator.internal_name, cover_label_size).items() if isize[0] > 0},
+            self._covers_thumbnails,
+            loaded_covers
+        )
+        self._covers_prefetch_task.signals.cover_loaded.connect(self._covers_prefetch_task_cover_loaded)
+
+        self._tasks_pool.start(self._covers_prefetch_task)
+
+
+    def _prefetch_neighbour_covers(self, row:int):
+        # selected one first, then the closest ones
+        rows = [row]
+
+        for idistance in range(1, self._covers_prefetch_rows + 1):
+            rows.append(row + idistance)
+            rows.append(row - idistance)
+
+        self._prefetch_covers(rows)
+
+
+    def _covers_prefetch_task_cover_loaded(self, emulator_name:str, key:tuple, image:QtGui.QImage):
+        # covers of previous prefetches are kept too, key has label size
+        if not self._covers_cache:
+            return
+
+        # like _rescale_cover, the size of a cover scaled to fit
+        # the label is kept for it
+        if key[4] is None:
+            cover_label_size = QtCore.QSize(key[1], key[2])
+
+            if cover_label_size == self._best_scales_label_size:
+                self._get_emulator_best_scales(emulator_name, cover_label_size).setdefault(key[0], (image.width(), image.height()))
+
+        self._covers_cache.put(key, QtGui.QPixmap.fromImage(image))
 
-        return list(self._roms.keys())[index]
+
+    def _rescale_cover(self, emulator:Emulator, cover_file_pathname:str, cover_label_size:QtCore.QSize, first_rom_cover_size:Optional[tuple] = None) -> QtGui.QPixmap:
+        emulator_best_scales = self._get_emulator_best_scales(emulator.internal_name, cover_label_size)
+        cover_size = first_rom_cover_size
+
+        if not cover_size and cover_file_pathname in emulator_best_scales and emulator_best_scales[cover_file_pathname][0] > 0:
+            cover_size = emulator_best_scales[cover_file_pathname]
+
+        image = self._covers_thumbnails.load_scaled_cover(cover_file_pathname, cover_label_size, cover_size)
+
+        if not cover_size:
+            emulator_best_scales[cover_file_pathname] = (image.width(), image.height())
+
+        return QtGui.QPixmap.fromImage(image)
+
+
+    def _get_rom_by_index(self, index: int) -> Optional[str]:
+        return self._games_model.get_rom_pathname(index)
 
 
     def _exit_button_clicked(self):
@@ -2071,8 +4466,9 @@ class MainWindow(QDialog):
 
 
     def _refresh_list_button_clicked(self):
-        self._show_current_emulator_roms(cached=False)
-        self._need_update_cover = True
+        self._covers_index.clear()
+        self._show_current_emulator_roms(cached=False, selected_rom=self._get_current_selected_rom())
+        self._update_cover()
 
 
     def _log_exception(self, x: Exception):
@@ -2083,10 +4479,16 @@ class MainWindow(QDialog):
 
 
     def _run_selected_game(self):
+        if self._launch_task:
+            # run again while launching cancels it
+            self._launch_task.cancel()
+            self._run_game_button.setText('Cancelling...')
+            return
+
         try:
             current_index = self._games_list.currentIndex()
 
-            if current_index:
+            if current_index.isValid():
                 current_emulator = self._get_current_emulator()
 
                 if current_emulator:
@@ -2098,13 +4500,43 @@ class MainWindow(QDialog):
                     rom_full_path = os.path.abspath(rom_path)
 
                     print('Running rom: ' + rom_full_path)
-                    self._emulator_process = current_emulator.run_rom(rom_full_path)
 
-                    self._run_antimicro()
+                    self._launch_task = LaunchTask(current_emulator, rom_full_path)
+                    self._launch_task.signals.stage_started.connect(self._launch_task_stage_started)
+                    self._launch_task.signals.launch_finished.connect(self._launch_task_launch_finished)
+                    self._launch_task.signals.launch_failed.connect(self._launch_task_launch_failed)
+
+                    self._launch_pool.start(self._launch_task)
         except Exception as x:
             self._log_exception(x)
 
 
+    def _launch_task_stage_started(self, stage:str):
+        if self._launch_task and not self._launch_task.progress.cancelled:
+            self._run_game_button.setText(stage + '...')
+
+
+    def _launch_task_launch_finished(self, process:Optional[subprocess.Popen]):
+        self._launch_task = None
+        self._run_game_button.setText(RUN_GAME_BUTTON_TEXT)
+
+        if process:
+            self._emulator_process = process
+            self._run_antimicro()
+        elif self._unpack_cache:
+            self._unpack_cache.release_in_use()
+
+
+    def _launch_task_launch_failed(self, x:Exception):
+        self._launch_task = None
+        self._run_game_button.setText(RUN_GAME_BUTTON_TEXT)
+
+        if self._unpack_cache:
+            self._unpack_cache.release_in_use()
+
+        self._log_exception(x)
+
+
     def _games_list_double_clicked(self):
         self._run_selected_game()
 
@@ -2142,26 +4574,30 @@ class MainWindow(QDialog):
         self._load_antimicro_profiles()
         self._switch_antimicro_profile(1)
         self._show_warning_message()
-        self._need_update_cover = True
+        self._update_cover()
+
+
+    def _get_current_game_name(self) -> Optional[str]:
+        return self._games_model.get_rom_name(self._games_list.currentIndex().row())
 
 
     def _games_list_copy_game_name(self):
-        current_row = self._games_list.currentItem()
+        game_name = self._get_current_game_name()
 
-        if not current_row:
+        if not game_name:
             return
 
-        self._clipboard.setText(current_row.text())
+        self._clipboard.setText(game_name)
 
 
     def _get_current_system_n_game_name(self) -> Optional[str]:
         current_emulator = self._get_current_emulator()
-        current_row = self._games_list.currentItem()
+        game_name = self._get_current_game_name()
 
-        if not current_row:
+        if not game_name:
             return None
 
-        return current_emulator.system_name + ' ' + current_row.text()
+        return current_emulator.system_name + ' ' + game_name
 
 
     def _games_list_copy_system_game_name(self):
@@ -2176,7 +4612,7 @@ class MainWindow(QDialog):
     def _get_current_selected_rom(self) -> Optional[str]:
         current_index = self._games_list.currentIndex()
 
-        if not current_index:
+        if not current_index.isValid():
             return None
 
         current_emulator = self._get_current_emulator()
@@ -2223,8 +4659,14 @@ class MainWindow(QDialog):
         QtGui.QDesktopServices.openUrl(url)
 
 
-    def _games_list_current_row_changed(self):
-        self._need_update_cover = True
+    def _games_list_current_row_changed(self, current:QModelIndex, previous:QModelIndex):
+        self._update_cover()
+
+        if current.isValid():
+            self._prefetch_neighbour_covers(current.row())
+
+            if self._unpack_warm_delay > 0 and self._unpack_cache:
+                self._unpack_warm_timer.start(self._unpack_warm_delay)
 
 
     def _run_game_button_clicked(self):
@@ -2280,9 +4722,27 @@ class MainWindow(QDialog):
         return icon
 
 
+print_startup_time('classes defined')
+
 app = QApplication(sys.argv)
 
+print_startup_time('application created')
+
 main_window = MainWindow()
+
+print_startup_time('main window created')
+
+if '--benchmark-scan' in sys.argv:
+    main_window.benchmark_scan()
+    sys.exit(0)
+
+if '--benchmark-titles' in sys.argv:
+    main_window.benchmark_titles()
+    sys.exit(0)
+
 main_window.show()
 
+# called once the event loop has shown the window
+QTimer.singleShot(0, lambda: print_startup_time('main window shown'))
+
 sys.exit(app.exec_())